@@ -31,6 +31,7 @@ module "buckets" {
   project_id    = module.project.project_id
   force_destroy = true
   names = [
+    "footystats-checkpoints",
     "footystats-league-list",
     "footystats-matches",
     "footystats-matches-transformed",
@@ -42,6 +43,7 @@ module "buckets" {
     "hkjc-team-list",
     "manual",
     "solver",
+    "solver-state",
     "simulation",
     "gcf"
   ]
@@ -65,6 +67,9 @@ module "buckets" {
       "../../assets/simulation/Spain La Liga.json",
     ]
   }
+  delete_after_days = {
+    "footystats-checkpoints" = 7
+  }
 }
 
 module "api-key" {
@@ -197,10 +202,11 @@ module "footystats-get-footystats" {
   region                           = var.region
   project_id                       = module.project.project_id
   environment_variables = {
-    MATCHES_BUCKET_NAME = module.buckets.names["footystats-matches"]
-    SEASONS_BUCKET_NAME = module.buckets.names["footystats-seasons"]
-    TABLES_BUCKET_NAME  = module.buckets.names["footystats-tables"]
-    TEAMS_BUCKET_NAME   = module.buckets.names["footystats-teams"]
+    CHECKPOINT_BUCKET_NAME = module.buckets.names["footystats-checkpoints"]
+    MATCHES_BUCKET_NAME    = module.buckets.names["footystats-matches"]
+    SEASONS_BUCKET_NAME    = module.buckets.names["footystats-seasons"]
+    TABLES_BUCKET_NAME     = module.buckets.names["footystats-tables"]
+    TEAMS_BUCKET_NAME      = module.buckets.names["footystats-teams"]
   }
 }
 
@@ -210,7 +216,7 @@ module "footystats-transform-matches" {
   name                  = "footystats_transform_matches"
   docker_repository     = google_artifact_registry_repository.repository.id
   bucket_name           = module.buckets.names["gcf"]
-  environment_variables = { BUCKET_NAME = module.buckets.names["footystats-matches-transformed"] }
+  environment_variables = { BUCKET_NAME = module.buckets.names["footystats-matches-transformed"], COMPRESS = tostring(var.compress_matches_transformed) }
   event_type            = "google.cloud.storage.object.v1.finalized"
   source_directory      = "../../src/function"
   region                = var.region
@@ -244,6 +250,7 @@ module "bigquery-footystats" {
       schema                    = file("../../src/bigquery/schema/footystats/matches_transformed.json")
       source_format             = "NEWLINE_DELIMITED_JSON"
       source_uris               = ["${module.buckets.urls["footystats-matches-transformed"]}/*/matches.json"]
+      compression               = var.compress_matches_transformed ? "GZIP" : "NONE"
       hive_partitioning_options = { source_uri_prefix = "${module.buckets.urls["footystats-matches-transformed"]}/{_COUNTRY:STRING}/{_NAME:STRING}/{_YEAR:STRING}/{_SEASON_ID:INTEGER}" }
     }
     seasons = {
@@ -465,18 +472,21 @@ module "solver-publish-messages" {
 module "solver" {
   source = "../modules/event-function"
 
-  name                  = "solver"
-  docker_repository     = google_artifact_registry_repository.repository.id
-  bucket_name           = module.buckets.names["gcf"]
-  timeout_s             = 540
-  available_memory      = "1Gi"
-  available_cpu         = 2
-  environment_variables = { BUCKET_NAME = module.buckets.names["solver"] }
-  event_type            = "google.cloud.pubsub.topic.v1.messagePublished"
-  topic_name            = module.pubsub-solver.id
-  source_directory      = "../../src/function"
-  region                = var.region
-  project_id            = module.project.project_id
+  name              = "solver"
+  docker_repository = google_artifact_registry_repository.repository.id
+  bucket_name       = module.buckets.names["gcf"]
+  timeout_s         = 540
+  available_memory  = "1Gi"
+  available_cpu     = 2
+  event_type        = "google.cloud.pubsub.topic.v1.messagePublished"
+  topic_name        = module.pubsub-solver.id
+  source_directory  = "../../src/function"
+  region            = var.region
+  project_id        = module.project.project_id
+  environment_variables = {
+    BUCKET_NAME       = module.buckets.names["solver"]
+    STATE_BUCKET_NAME = module.buckets.names["solver-state"]
+  }
 }
 
 module "bigquery-solver" {
@@ -500,6 +510,25 @@ module "bigquery-solver" {
     }
   }
   routines = {
+    get_match_history = {
+      definition_body = templatefile("../../src/bigquery/sql/solver/get_match_history.sql", { project_id = module.project.project_id })
+      routine_type    = "TABLE_VALUED_FUNCTION"
+      language        = "SQL"
+      arguments = [
+        {
+          name      = "league_type"
+          data_type = jsonencode({ "typeKind" : "STRING" })
+        },
+        {
+          name      = "start_time"
+          data_type = jsonencode({ "typeKind" : "INT64" })
+        },
+        {
+          name      = "end_time"
+          data_type = jsonencode({ "typeKind" : "INT64" })
+        }
+      ]
+    }
     get_matches = {
       definition_body = templatefile("../../src/bigquery/sql/solver/get_matches.sql", { project_id = module.project.project_id })
       routine_type    = "TABLE_VALUED_FUNCTION"
@@ -545,14 +574,18 @@ module "pubsub-simulate-tournament" {
 module "simulation-publish-message" {
   source = "../modules/event-function"
 
-  name                  = "simulation_publish_messages"
-  docker_repository     = google_artifact_registry_repository.repository.id
-  bucket_name           = module.buckets.names["gcf"]
-  environment_variables = { TOPIC_NAME = module.pubsub-simulate-tournament.id }
-  event_type            = "google.cloud.storage.object.v1.finalized"
-  source_directory      = "../../src/function"
-  region                = var.region
-  project_id            = module.project.project_id
+  name              = "simulation_publish_messages"
+  docker_repository = google_artifact_registry_repository.repository.id
+  bucket_name       = module.buckets.names["gcf"]
+  environment_variables = {
+    TOPIC_NAME              = module.pubsub-simulate-tournament.id,
+    RESULT_BUCKET_NAME      = module.buckets.names["simulation"],
+    RATING_CHANGE_THRESHOLD = 0.02
+  }
+  event_type       = "google.cloud.storage.object.v1.finalized"
+  source_directory = "../../src/function"
+  region           = var.region
+  project_id       = module.project.project_id
   event_filters = {
     attribute = "bucket"
     value     = module.buckets.names["solver"]
@@ -566,9 +599,12 @@ module "simulate-tournament" {
   docker_repository = google_artifact_registry_repository.repository.id
   bucket_name       = module.buckets.names["gcf"]
   timeout_s         = 300
+  available_memory  = "1Gi"
+  available_cpu     = 2
   environment_variables = {
     INPUT_BUCKET_NAME  = module.buckets.names["manual"],
-    RESULT_BUCKET_NAME = module.buckets.names["simulation"]
+    RESULT_BUCKET_NAME = module.buckets.names["simulation"],
+    NO_OF_PROCESSES    = 2
   }
   event_type       = "google.cloud.pubsub.topic.v1.messagePublished"
   topic_name       = module.pubsub-simulate-tournament.id
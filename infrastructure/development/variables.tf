@@ -14,3 +14,9 @@ variable "region" {
   type        = string
   description = "Region where resources are created."
 }
+
+variable "compress_matches_transformed" {
+  description = "Whether transformed matches are stored gzip-compressed."
+  type        = bool
+  default     = false
+}
@@ -26,6 +26,7 @@ resource "google_bigquery_table" "external_tables" {
     schema                = each.value["schema"]
     source_format         = each.value["source_format"]
     source_uris           = each.value["source_uris"]
+    compression           = each.value["compression"]
     ignore_unknown_values = true
 
     dynamic "hive_partitioning_options" {
@@ -15,6 +15,7 @@ variable "external_tables" {
     schema        = string,
     source_format = string,
     source_uris   = optional(list(string))
+    compression   = optional(string)
     hive_partitioning_options = optional(object({
       source_uri_prefix = string,
     }))
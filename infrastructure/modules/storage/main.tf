@@ -16,6 +16,18 @@ resource "google_storage_bucket" "buckets" {
   location      = var.location
   force_destroy = var.force_destroy
   project       = var.project_id
+
+  dynamic "lifecycle_rule" {
+    for_each = contains(keys(var.delete_after_days), each.value) ? [var.delete_after_days[each.value]] : []
+    content {
+      condition {
+        age = lifecycle_rule.value
+      }
+      action {
+        type = "Delete"
+      }
+    }
+  }
 }
 
 resource "google_storage_bucket_object" "files" {
@@ -30,3 +30,9 @@ variable "force_destroy" {
   type        = bool
   default     = false
 }
+
+variable "delete_after_days" {
+  description = "Map of bucket name => age in days after which objects are deleted."
+  type        = map(number)
+  default     = {}
+}
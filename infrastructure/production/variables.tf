@@ -14,3 +14,9 @@ variable "region" {
   type        = string
   default     = "asia-east2"
 }
+
+variable "compress_matches_transformed" {
+  description = "Whether transformed matches are stored gzip-compressed."
+  type        = bool
+  default     = false
+}
@@ -6,5 +6,4 @@ LEFT JOIN ${project_id}.simulation.leagues simulation ON master.footystats_name
 WHERE status = 'complete'
     AND is_simulate
     AND type = type
-GROUP BY footystats_name
-HAVING latest_match_date > COALESCE(last_run, 0)
\ No newline at end of file
+GROUP BY footystats_name
\ No newline at end of file
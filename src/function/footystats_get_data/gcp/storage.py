@@ -2,8 +2,10 @@ import json
 import logging
 import ssl
 import urllib3
+from collections.abc import Iterable
 
 import requests
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
 
 CLIENT = storage.Client()
@@ -23,6 +25,30 @@ def download_blob(blob_name: str, bucket_name: str) -> str:
     return CLIENT.bucket(bucket_name).blob(blob_name).download_as_text()
 
 
+def download_json(blob_name: str, bucket_name: str) -> dict | list | None:
+    try:
+        return json.loads(download_blob(blob_name, bucket_name))
+    except NotFound:
+        return None
+
+
+def list_blob_names(prefix: str, bucket_name: str) -> list[str]:
+    return [blob.name for blob in CLIENT.list_blobs(bucket_name, prefix=prefix)]
+
+
+def delete_blobs(prefix: str, bucket_name: str):
+    blobs = list(CLIENT.list_blobs(bucket_name, prefix=prefix))
+    CLIENT.bucket(bucket_name).delete_blobs(blobs)
+    logging.info(f"Deleted blobs: {prefix=} count={len(blobs)}")
+
+
+def get_blob(
+    blob_name: str, bucket_name: str, hive_partitioning: dict | None = None
+) -> storage.Blob | None:
+    blob_name = get_directory(blob_name, hive_partitioning)
+    return CLIENT.bucket(bucket_name).get_blob(blob_name)
+
+
 def upload_json_to_bucket(
     data: list[dict],
     blob_name: str,
@@ -47,6 +73,35 @@ def upload_json_to_bucket(
         raise GCSUploadError()
 
 
+def upload_ndjson_to_bucket(
+    data: Iterable[dict],
+    blob_name: str,
+    bucket_name: str,
+    hive_partitioning: dict | None = None,
+    metadata: dict[str, str] | None = None,
+):
+    blob_name = get_directory(blob_name, hive_partitioning)
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+    blob.metadata = metadata
+
+    try:
+        with blob.open("wb", content_type="application/json", ignore_flush=True) as f:
+            for i, record in enumerate(data):
+                if i:
+                    f.write(b"\n")
+                f.write(json.dumps(record).encode())
+        logging.info(f"Uploaded blob: {blob_name=}")
+    except (
+        urllib3.exceptions.MaxRetryError,
+        requests.exceptions.HTTPError,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.SSLError,
+        ssl.SSLEOFError,
+    ) as error:
+        logging.warning(f"Upload failed: {blob_name=} {error=}")
+        raise GCSUploadError()
+
+
 def get_directory(blob_name: str, hive_partitioning: dict | None = None):
     if hive_partitioning:
         hive_dir = "/".join(
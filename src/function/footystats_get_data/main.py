@@ -1,5 +1,14 @@
+import hashlib
+import json
 import logging
 import os
+import posixpath
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
 
 import functions_framework
 import requests
@@ -18,62 +27,270 @@ BUCKET_NAMES = {
     "tables": os.environ["TABLES_BUCKET_NAME"],
     "teams": os.environ["TEAMS_BUCKET_NAME"],
 }
+CHECKPOINT_BUCKET_NAME = os.environ.get("CHECKPOINT_BUCKET_NAME")
+IGNORED_FIELDS = frozenset(
+    name for name in os.environ.get("IGNORED_FIELDS", "").split(",") if name
+)
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("MAX_CONCURRENT_REQUESTS", 4))
+SESSION = requests.Session()
+SESSION.mount(
+    "https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_CONCURRENT_REQUESTS)
+)
+
+
+RATE_LIMIT = float(os.environ.get("RATE_LIMIT", 1))
+RATE_LIMIT_BURST = float(os.environ.get("RATE_LIMIT_BURST", 10))
+MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 5))
+BACKOFF_BASE = 1
+MAX_BACKOFF = 20
+REQUEST_TIMEOUT = 5
+# Retries stop this long before the function timeout, leaving time to upload
+FUNCTION_TIMEOUT = float(os.environ.get("FUNCTION_TIMEOUT", 60))
+DEADLINE_MARGIN = 10
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 
 class TooManyRequestsError(Exception):
     pass
 
 
+@dataclass
+class TokenBucket:
+    rate: float
+    capacity: float
+    tokens: float = field(init=False)
+    updated: float = field(init=False, default_factory=time.monotonic)
+    lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.tokens = self.capacity
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                self.refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def defer(self, seconds: float):
+        # Hold back every caller, not just the one that was told to retry later
+        with self.lock:
+            self.refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+RATE_LIMITER = TokenBucket(RATE_LIMIT, RATE_LIMIT_BURST)
+
+
 @functions_framework.cloud_event
 def main(cloud_event: CloudEvent):
+    deadline = time.monotonic() + FUNCTION_TIMEOUT - DEADLINE_MARGIN
     message = decode_message(cloud_event)
     endpoint, season_id = message["endpoint"], message["season_id"]
+    # Redeliveries keep the event id, so they resume from the same checkpoints
+    checkpoint = f"{endpoint}/{season_id}/{cloud_event['id']}/"
     data = get_footystats(
-        endpoint, key=os.environ["FOOTYSTATS_API_KEY"], season_id=season_id
+        endpoint,
+        key=os.environ["FOOTYSTATS_API_KEY"],
+        checkpoint=checkpoint,
+        deadline=deadline,
+        season_id=season_id,
+    )
+    hive_partitioning = {
+        "_COUNTRY": message["country"],
+        "_NAME": message["name"],
+        "_YEAR": message["year"],
+        "_SEASON_ID": season_id,
+    }
+    content_hash = get_content_hash(data)
+    blob = storage.get_blob(
+        f"{endpoint}.json", BUCKET_NAMES[endpoint], hive_partitioning
     )
-    storage.upload_json_to_bucket(
-        data,
-        blob_name=f"{endpoint}.json",
-        bucket_name=BUCKET_NAMES[endpoint],
-        hive_partitioning={
-            "_COUNTRY": message["country"],
-            "_NAME": message["name"],
-            "_YEAR": message["year"],
-            "_SEASON_ID": season_id,
-        },
+    if blob and (blob.metadata or {}).get("content_hash") == content_hash:
+        logging.info(
+            f"Skipped unchanged upload: {endpoint=}, {season_id=}, skipped=1, bytes_saved={blob.size}"
+        )
+    else:
+        storage.upload_ndjson_to_bucket(
+            data if isinstance(data, list) else [data],
+            blob_name=f"{endpoint}.json",
+            bucket_name=BUCKET_NAMES[endpoint],
+            hive_partitioning=hive_partitioning,
+            metadata={"content_hash": content_hash},
+        )
+    if CHECKPOINT_BUCKET_NAME:
+        storage.delete_blobs(checkpoint, CHECKPOINT_BUCKET_NAME)
+
+
+def strip_fields(data, ignored_fields: frozenset[str]):
+    if isinstance(data, dict):
+        return {
+            k: strip_fields(v, ignored_fields)
+            for k, v in data.items()
+            if k not in ignored_fields
+        }
+    if isinstance(data, list):
+        return [strip_fields(v, ignored_fields) for v in data]
+    return data
+
+
+def get_content_hash(
+    data: dict | list[dict], ignored_fields: frozenset[str] = IGNORED_FIELDS
+) -> str:
+    # Key order and volatile fields must not count as a change
+    canonical = json.dumps(
+        strip_fields(data, ignored_fields), sort_keys=True, separators=(",", ":")
     )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def get_retry_after(response: requests.Response) -> float | None:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is None:
+        return None
+    try:
+        seconds = float(retry_after)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(retry_after).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), MAX_BACKOFF)
+
+
+def get_backoff(attempt: int) -> float:
+    return min(BACKOFF_BASE * 2**attempt + random.uniform(0, BACKOFF_BASE), MAX_BACKOFF)
 
 
-def get_footystats(endpoint: str, key: str, **kwargs) -> dict | list[dict]:
-    page = 1
-    results = []
+def is_past(deadline: float | None, seconds: float = 0) -> bool:
+    return deadline is not None and time.monotonic() + seconds > deadline
 
-    while True:
+
+def get_page(
+    endpoint: str, key: str, page: int, deadline: float | None = None, **kwargs
+) -> dict:
+    for attempt in range(MAX_RETRIES + 1):
+        RATE_LIMITER.acquire()
+        # Give up before the function times out; the checkpoint survives for
+        # the redelivered event to resume from
+        if is_past(deadline, REQUEST_TIMEOUT):
+            logging.warning(
+                f"Get footystats data out of time: {endpoint=}, {page=}, {kwargs=}"
+            )
+            break
         logging.info(f"Getting footystats data: {endpoint=}, {page=}, {kwargs=}")
+        delay, deferred = get_backoff(attempt), False
 
         try:
-            response = requests.get(
+            response = SESSION.get(
                 f"https://api.football-data-api.com/league-{endpoint}",
                 params={"key": key, "page": page, **kwargs},
-                timeout=5,
+                timeout=REQUEST_TIMEOUT,
             )
-            response.raise_for_status()
-        except (requests.exceptions.HTTPError, requests.exceptions.ReadTimeout):
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            pass
+        else:
+            if response.ok:
+                logging.info(f"Got footystats data: {endpoint=}, {page=}, {kwargs=}")
+                return response.json()
+            if response.status_code not in RETRY_STATUS_CODES:
+                break
+            retry_after = get_retry_after(response)
+            if retry_after is not None:
+                delay, deferred = retry_after, True
+                RATE_LIMITER.defer(delay)
+
+        if attempt == MAX_RETRIES:
+            break
+        if is_past(deadline, delay + REQUEST_TIMEOUT):
             logging.warning(
-                f"Get footystats data failed: {endpoint=}, {page=}, {kwargs=}"
+                f"Get footystats data out of time: {endpoint=}, {page=}, {kwargs=}"
             )
-            raise TooManyRequestsError()
+            break
+        logging.warning(
+            f"Get footystats data failed: {endpoint=}, {page=}, {kwargs=}, {attempt=}, {delay=:.1f}"
+        )
+        # A deferral is waited out by the next acquire
+        if not deferred:
+            time.sleep(delay)
+
+    logging.warning(f"Get footystats data failed: {endpoint=}, {page=}, {kwargs=}")
+    raise TooManyRequestsError()
+
 
-        response = response.json()
-        data = response["data"]
+def get_saved_pages(checkpoint: str | None) -> set[int]:
+    # One listing per invocation, so a first delivery pays no per-page reads
+    if not (checkpoint and CHECKPOINT_BUCKET_NAME):
+        return set()
+    return {
+        int(posixpath.splitext(posixpath.basename(name))[0])
+        for name in storage.list_blob_names(checkpoint, CHECKPOINT_BUCKET_NAME)
+    }
 
-        if isinstance(data, dict):
-            return data
-        results.extend(data)
 
-        logging.info(f"Got footystats data: {endpoint=}, {page=}, {kwargs=}")
+def get_checkpointed_page(
+    endpoint: str,
+    key: str,
+    page: int,
+    checkpoint: str | None = None,
+    saved_pages: set[int] | None = None,
+    deadline: float | None = None,
+    **kwargs,
+) -> dict:
+    if not (checkpoint and CHECKPOINT_BUCKET_NAME):
+        return get_page(endpoint, key, page, deadline, **kwargs)
 
-        pager = response["pager"]
-        if pager["current_page"] >= pager["max_page"]:
-            return results
-        page += 1
+    blob_name = f"{checkpoint}{page}.json"
+    if saved_pages and page in saved_pages:
+        logging.info(f"Resumed footystats data: {endpoint=}, {page=}, {kwargs=}")
+        return storage.download_json(blob_name, CHECKPOINT_BUCKET_NAME)
+
+    response = get_page(endpoint, key, page, deadline, **kwargs)
+    storage.upload_json_to_bucket(response, blob_name, CHECKPOINT_BUCKET_NAME)
+    return response
+
+
+def get_footystats(
+    endpoint: str,
+    key: str,
+    checkpoint: str | None = None,
+    deadline: float | None = None,
+    **kwargs,
+) -> dict | list[dict]:
+    start = time.perf_counter()
+    saved_pages = get_saved_pages(checkpoint)
+    response = get_checkpointed_page(
+        endpoint, key, 1, checkpoint, saved_pages, deadline, **kwargs
+    )
+    data = response["data"]
+
+    if isinstance(data, dict):
+        return data
+    results = list(data)
+
+    # The first page tells how many there are, so fetch the rest concurrently
+    pager = response["pager"]
+    pages = range(pager["current_page"] + 1, pager["max_page"] + 1)
+    if pages:
+        with ThreadPoolExecutor(min(MAX_CONCURRENT_REQUESTS, len(pages))) as executor:
+            for data in executor.map(
+                lambda page: get_checkpointed_page(
+                    endpoint, key, page, checkpoint, saved_pages, deadline, **kwargs
+                )["data"],
+                pages,
+            ):
+                results.extend(data)
+
+    elapsed = time.perf_counter() - start
+    logging.info(
+        f"Fetched footystats data: {endpoint=}, pages={len(pages) + 1}, {elapsed=:.2f}"
+    )
+    return results
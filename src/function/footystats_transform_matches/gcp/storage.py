@@ -1,12 +1,18 @@
+import gzip
+import io
 import json
 import logging
 import ssl
 import urllib3
+from collections.abc import Iterable, Iterator
 
 import requests
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
 
 CLIENT = storage.Client()
+# Stored as is, without Content-Encoding, so that nothing transcodes it on read
+GZIP = "application/gzip"
 
 
 class GCSUploadError(Exception):
@@ -23,6 +29,27 @@ def download_blob(blob_name: str, bucket_name: str) -> str:
     return CLIENT.bucket(bucket_name).blob(blob_name).download_as_text()
 
 
+def blob_exists(blob_name: str, bucket_name: str) -> bool:
+    return CLIENT.bucket(bucket_name).blob(blob_name).exists()
+
+
+def download_json(blob_name: str, bucket_name: str) -> dict | list | None:
+    try:
+        return json.loads(download_blob(blob_name, bucket_name))
+    except NotFound:
+        return None
+
+
+def iter_ndjson(blob_name: str, bucket_name: str) -> Iterator[dict]:
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+    blob.reload()
+    with blob.open("rb") as f:
+        stream = gzip.GzipFile(fileobj=f) if blob.content_type == GZIP else f
+        for line in io.TextIOWrapper(stream, encoding="utf-8"):
+            if line.strip():
+                yield json.loads(line)
+
+
 def upload_json_to_bucket(
     data: list[dict],
     blob_name: str,
@@ -46,6 +73,37 @@ def upload_json_to_bucket(
         raise GCSUploadError()
 
 
+def upload_ndjson_to_bucket(
+    data: Iterable[dict],
+    blob_name: str,
+    bucket_name: str,
+    hive_partitioning: dict | None = None,
+    compress: bool = False,
+):
+    blob_name = get_directory(blob_name, hive_partitioning)
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+    content_type = GZIP if compress else "application/json"
+
+    try:
+        with blob.open("wb", content_type=content_type, ignore_flush=True) as f:
+            stream = gzip.GzipFile(fileobj=f, mode="wb", mtime=0) if compress else f
+            for i, record in enumerate(data):
+                if i:
+                    stream.write(b"\n")
+                stream.write(json.dumps(record).encode())
+            if compress:
+                stream.close()
+        logging.info(f"Uploaded blob: {blob_name=} {compress=}")
+    except (
+        urllib3.exceptions.MaxRetryError,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.SSLError,
+        ssl.SSLEOFError,
+    ) as error:
+        logging.warning(f"Upload failed: {blob_name=} {error=}")
+        raise GCSUploadError()
+
+
 def get_directory(blob_name: str, hive_partitioning: dict | None = None):
     if hive_partitioning:
         hive_dir = "/".join(
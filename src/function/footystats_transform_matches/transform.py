@@ -0,0 +1,318 @@
+import re
+from enum import Enum
+from itertools import chain
+
+import numpy as np
+
+REDUCE_FROM_MINUTE = 70
+REDUCE_LEADING_GOAL_VALUE = 0.5
+REDUCE_RED_CARD_GOAL_VALUE = 0.2
+XG_WEIGHT = 0.67
+ADJ_FACTORS = {
+    (False, False): 1,
+    (True, False): 1,
+    (False, True): 1.04,
+    (True, True): 1.05,
+}
+XG_ADJ_FACTOR = 1.1
+MINUTE_PATTERN = re.compile(r"(^1?\d{1,2})")
+COLUMNS = [
+    "id",
+    "homeGoalCount",
+    "awayGoalCount",
+    "homeGoals",
+    "awayGoals",
+    "goal_timings_recorded",
+    "card_timings_recorded",
+    "team_a_red_cards",
+    "team_b_red_cards",
+    "total_xg",
+    "team_a_xg",
+    "team_b_xg",
+]
+
+
+class Team(Enum):
+    HOME = 1
+    AWAY = 2
+
+    def __lt__(self, other: "Team"):
+        return self.value > other.value
+
+
+def transform_matches(
+    _match: dict,
+) -> dict:
+    home_adj, away_adj = (
+        _match["homeGoalCount"],
+        _match["awayGoalCount"],
+    )
+    more_player_team = None
+
+    goal_timings_recorded = (
+        _match["goal_timings_recorded"] == 1
+        and "None" not in _match["homeGoals"]
+        and "None" not in _match["awayGoals"]
+    )
+    card_timings_recorded = _match["card_timings_recorded"] == 1
+
+    if card_timings_recorded == 1:
+        more_player_team = get_more_players_team(
+            _match["team_a_red_cards"], _match["team_b_red_cards"]
+        )
+
+    if goal_timings_recorded:
+        goal_timings = get_goal_timings_dict(_match["homeGoals"], _match["awayGoals"])
+        home_adj, away_adj = reduce_goal_value(goal_timings, more_player_team)
+    elif more_player_team == Team.HOME:
+        home_adj *= 1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)
+    elif more_player_team == Team.AWAY:
+        away_adj *= 1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)
+
+    adj_factor = ADJ_FACTORS[(card_timings_recorded, goal_timings_recorded)]
+    home_adj *= adj_factor
+    away_adj *= adj_factor
+
+    if _match["total_xg"] > 0:
+        home_avg = (
+            home_adj * (1 - XG_WEIGHT) + _match["team_a_xg"] * XG_ADJ_FACTOR * XG_WEIGHT
+        )
+        away_avg = (
+            away_adj * (1 - XG_WEIGHT) + _match["team_b_xg"] * XG_ADJ_FACTOR * XG_WEIGHT
+        )
+    else:
+        home_avg, away_avg = home_adj, away_adj
+
+    return {
+        "id": _match["id"],
+        "home_adj": home_adj,
+        "away_adj": away_adj,
+        "home_avg": home_avg,
+        "away_avg": away_avg,
+    }
+
+
+def get_more_players_team(home_red_cards: int, away_red_cards: int) -> Team | None:
+    if home_red_cards > away_red_cards:
+        return Team.AWAY
+    if away_red_cards > home_red_cards:
+        return Team.HOME
+    return None
+
+
+def get_goal_timings_dict(home: list[str], away: list[str]) -> list[tuple]:
+    timings = [
+        (int(re.search(r"(^1?\d{1,2})", minute).group()), minute, Team.HOME)
+        for minute in home
+    ]
+    timings.extend(
+        (int(re.search(r"(^1?\d{1,2})", minute).group()), minute, Team.AWAY)
+        for minute in away
+    )
+    return sorted(timings)
+
+
+def reduce_goal_value(
+    goal_timings: list[tuple[int, Team]], more_player_team: Team
+) -> tuple[float]:
+    if not goal_timings:
+        return 0, 0
+    home = home_adj = away = away_adj = 0
+    for timing, _, team in goal_timings:
+        timing = min(timing, 90)
+        late_leading_adj_val = (
+            max(timing - REDUCE_FROM_MINUTE, 0)
+            / (90 - REDUCE_FROM_MINUTE)
+            * REDUCE_LEADING_GOAL_VALUE
+        )
+        more_player_adj_val = (timing / 90) * REDUCE_RED_CARD_GOAL_VALUE
+
+        goal_val = 1
+        if team == more_player_team:
+            goal_val *= 1 - more_player_adj_val
+        if team == Team.AWAY:
+            away += 1
+            if away - home > 1:
+                goal_val *= 1 - late_leading_adj_val
+            away_adj += goal_val
+        elif team == Team.HOME:
+            home += 1
+            if home - away > 1:
+                goal_val *= 1 - late_leading_adj_val
+            home_adj += goal_val
+    return home_adj, away_adj
+
+
+def get_columns(matches: list[dict]) -> dict[str, list]:
+    return {column: [_match[column] for _match in matches] for column in COLUMNS}
+
+
+def get_group_positions(groups: np.ndarray) -> np.ndarray:
+    # Position of each element within its run of equal group values
+    index = np.arange(len(groups))
+    is_start = np.ones(len(groups), dtype=bool)
+    is_start[1:] = groups[1:] != groups[:-1]
+    return index - np.maximum.accumulate(np.where(is_start, index, 0))
+
+
+def reduce_goal_value_batch(
+    columns: dict[str, list],
+    timed: np.ndarray,
+    home_more_players: np.ndarray,
+    away_more_players: np.ndarray,
+) -> tuple[np.ndarray]:
+    goals = {}
+    for side in ("home", "away"):
+        side_goals = [columns[f"{side}Goals"][i] for i in timed.tolist()]
+        goals[side] = (
+            np.repeat(timed, [len(minutes) for minutes in side_goals]),
+            list(chain.from_iterable(side_goals)),
+        )
+    goal_match = np.concatenate([goals["home"][0], goals["away"][0]])
+    goal_is_home = np.arange(len(goal_match)) < len(goals["home"][0])
+
+    # Minute texts repeat heavily, so parse each distinct one once. Their sorted
+    # rank orders goals like sorting (minute, text, Team) tuples, where
+    # Team.AWAY < Team.HOME.
+    texts, text_rank = np.unique(
+        np.array(goals["home"][1] + goals["away"][1], dtype=str), return_inverse=True
+    )
+    minute = np.array(
+        [int(MINUTE_PATTERN.search(text).group()) for text in texts.tolist()],
+        dtype=int,
+    )[text_rank]
+    order = np.lexsort((goal_is_home, text_rank, minute, goal_match))
+    goal_match, goal_is_home = goal_match[order], goal_is_home[order]
+    timing = np.minimum(minute[order], 90)
+    position = get_group_positions(goal_match)
+
+    home = np.cumsum(goal_is_home)
+    away = np.cumsum(~goal_is_home)
+    start = np.arange(len(goal_match)) - position
+    home -= home[start] - goal_is_home[start]
+    away -= away[start] - ~goal_is_home[start]
+    is_leading = np.where(goal_is_home, home - away > 1, away - home > 1)
+
+    late_leading_adj_val = (
+        np.maximum(timing - REDUCE_FROM_MINUTE, 0)
+        / (90 - REDUCE_FROM_MINUTE)
+        * REDUCE_LEADING_GOAL_VALUE
+    )
+    more_player_adj_val = (timing / 90) * REDUCE_RED_CARD_GOAL_VALUE
+    is_more_players = np.where(
+        goal_is_home, home_more_players[goal_match], away_more_players[goal_match]
+    )
+    goal_val = np.where(is_more_players, 1 - more_player_adj_val, 1.0)
+    goal_val = np.where(is_leading, goal_val * (1 - late_leading_adj_val), goal_val)
+
+    # Add the n-th goal of every match at once to keep the per-row summation order
+    adj = np.zeros((2, len(columns["id"])))
+    side = (~goal_is_home).astype(int)
+    by_position = np.argsort(position, kind="stable")
+    bounds = np.searchsorted(
+        position[by_position], np.arange(position.max(initial=-1) + 2)
+    )
+    for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        goal = by_position[start:end]
+        adj[side[goal], goal_match[goal]] += goal_val[goal]
+    return adj[0], adj[1]
+
+
+def transform_matches_batch(columns: dict[str, list]) -> list[dict]:
+    goal_timings_recorded = np.array(
+        [
+            recorded == 1 and "None" not in home and "None" not in away
+            for recorded, home, away in zip(
+                columns["goal_timings_recorded"],
+                columns["homeGoals"],
+                columns["awayGoals"],
+            )
+        ],
+        dtype=bool,
+    )
+    card_timings_recorded = np.array(
+        [recorded == 1 for recorded in columns["card_timings_recorded"]], dtype=bool
+    )
+    home_red_cards = np.array(columns["team_a_red_cards"])
+    away_red_cards = np.array(columns["team_b_red_cards"])
+    home_more_players = card_timings_recorded & (away_red_cards > home_red_cards)
+    away_more_players = card_timings_recorded & (home_red_cards > away_red_cards)
+
+    home_adj, away_adj = reduce_goal_value_batch(
+        columns,
+        np.flatnonzero(goal_timings_recorded),
+        home_more_players,
+        away_more_players,
+    )
+    adj_factor = np.where(
+        card_timings_recorded,
+        ADJ_FACTORS[(True, True)],
+        ADJ_FACTORS[(False, True)],
+    )
+    home_goal_count = np.array(columns["homeGoalCount"], dtype=float)
+    away_goal_count = np.array(columns["awayGoalCount"], dtype=float)
+    home_adj = np.where(
+        goal_timings_recorded,
+        home_adj * adj_factor,
+        np.where(
+            home_more_players,
+            home_goal_count * (1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)),
+            home_goal_count,
+        ),
+    )
+    away_adj = np.where(
+        goal_timings_recorded,
+        away_adj * adj_factor,
+        np.where(
+            away_more_players,
+            away_goal_count * (1 - (REDUCE_RED_CARD_GOAL_VALUE / 2)),
+            away_goal_count,
+        ),
+    )
+
+    has_xg = np.array(columns["total_xg"], dtype=float) > 0
+    home_avg = np.where(
+        has_xg,
+        home_adj * (1 - XG_WEIGHT)
+        + np.array(columns["team_a_xg"], dtype=float) * XG_ADJ_FACTOR * XG_WEIGHT,
+        home_adj,
+    )
+    away_avg = np.where(
+        has_xg,
+        away_adj * (1 - XG_WEIGHT)
+        + np.array(columns["team_b_xg"], dtype=float) * XG_ADJ_FACTOR * XG_WEIGHT,
+        away_adj,
+    )
+
+    # Unadjusted goal counts pass through with their original type
+    home_unadjusted = ~goal_timings_recorded & ~home_more_players
+    away_unadjusted = ~goal_timings_recorded & ~away_more_players
+    home_adj = [
+        count if unadjusted else adj
+        for count, unadjusted, adj in zip(
+            columns["homeGoalCount"], home_unadjusted.tolist(), home_adj.tolist()
+        )
+    ]
+    away_adj = [
+        count if unadjusted else adj
+        for count, unadjusted, adj in zip(
+            columns["awayGoalCount"], away_unadjusted.tolist(), away_adj.tolist()
+        )
+    ]
+    return [
+        {
+            "id": id,
+            "home_adj": _home_adj,
+            "away_adj": _away_adj,
+            "home_avg": _home_avg if _has_xg else _home_adj,
+            "away_avg": _away_avg if _has_xg else _away_adj,
+        }
+        for id, _home_adj, _away_adj, _home_avg, _away_avg, _has_xg in zip(
+            columns["id"],
+            home_adj,
+            away_adj,
+            home_avg.tolist(),
+            away_avg.tolist(),
+            has_xg.tolist(),
+        )
+    ]
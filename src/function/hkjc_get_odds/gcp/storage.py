@@ -2,6 +2,7 @@ import json
 import logging
 import ssl
 import urllib3
+from collections.abc import Iterable
 
 import requests
 from google.cloud import storage
@@ -46,6 +47,32 @@ def upload_json_to_bucket(
         raise GCSUploadError()
 
 
+def upload_ndjson_to_bucket(
+    data: Iterable[dict],
+    blob_name: str,
+    bucket_name: str,
+    hive_partitioning: dict | None = None,
+):
+    blob_name = get_directory(blob_name, hive_partitioning)
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+
+    try:
+        with blob.open("wb", content_type="application/json", ignore_flush=True) as f:
+            for i, record in enumerate(data):
+                if i:
+                    f.write(b"\n")
+                f.write(json.dumps(record).encode())
+        logging.info(f"Uploaded blob: {blob_name=}")
+    except (
+        urllib3.exceptions.MaxRetryError,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.SSLError,
+        ssl.SSLEOFError,
+    ) as error:
+        logging.warning(f"Upload failed: {blob_name=} {error=}")
+        raise GCSUploadError()
+
+
 def get_directory(blob_name: str, hive_partitioning: dict | None = None):
     if hive_partitioning:
         hive_dir = "/".join(
@@ -14,7 +14,7 @@ setup_logging()
 
 @functions_framework.cloud_event
 def main(_):
-    storage.upload_json_to_bucket(
+    storage.upload_ndjson_to_bucket(
         data=get_hkjc_odds(odds_types=json.loads(os.environ["ODDS_TYPES"])),
         blob_name="odds.json",
         bucket_name=os.environ["BUCKET_NAME"],
@@ -22,7 +22,7 @@ def main(_):
     )
 
 
-def get_hkjc_odds(odds_types: list[str]) -> dict:
+def get_hkjc_odds(odds_types: list[str]) -> list[dict]:
     logging.info(f"Getting HKJC data: {odds_types=}")
     body = """
       query matchList($startIndex: Int, $endIndex: Int,$startDate: String, $endDate: String, $matchIds: [String], $tournIds: [String], $fbOddsTypes: [FBOddsType]!, $fbOddsTypesM: [FBOddsType]!, $inplayOnly: Boolean, $featuredMatchesOnly: Boolean, $frontEndIds: [String], $earlySettlementOnly: Boolean, $showAllMatch: Boolean) {
@@ -0,0 +1,219 @@
+import argparse
+import csv
+import json
+import math
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import combinations, permutations
+from pathlib import Path
+
+from simulation.models import Match, Team
+from simulation.plan import compile_plan
+from simulation.simulate import simulate_tournament
+from simulation.tournaments import Groups, VectorizedKnockout, VectorizedSeason, Winner
+
+ASSETS = Path(__file__).resolve().parents[3] / "assets"
+ROUND_TYPES = {
+    "Groups": Groups,
+    "Knockout": VectorizedKnockout,
+    "Season": VectorizedSeason,
+    "Winner": Winner,
+}
+AVG_GOAL = 1.35
+HOME_ADV = 0.15
+SEASON_SIZE = 20
+SWISS_SIZE = 36
+SWISS_ROUNDS = 8
+GROUP_SIZE = 4
+
+
+def get_team_ids() -> list[str]:
+    with open(ASSETS / "teams.csv", encoding="utf-8-sig") as f:
+        return [row[1] for row in csv.reader(f) if row[1]]
+
+
+def get_fixtures(
+    teams: list[Team], leg: int | str, rng: random.Random
+) -> list[tuple[Team]]:
+    if leg == 1:
+        return list(combinations(teams, 2))
+    if leg == 2:
+        return list(permutations(teams, 2))
+
+    fixtures = []
+    for _ in range(SWISS_ROUNDS):
+        teams = rng.sample(teams, len(teams))
+        fixtures.extend(zip(teams[::2], teams[1::2]))
+    return fixtures
+
+
+def get_matches(
+    teams: list[Team], leg: int | str, played: float, rng: random.Random
+) -> list[Match]:
+    return [
+        (
+            Match(
+                home_team, away_team, "complete", rng.randint(0, 4), rng.randint(0, 4)
+            )
+            if rng.random() < played
+            else Match(home_team, away_team)
+        )
+        for home_team, away_team in get_fixtures(teams, leg, rng)
+    ]
+
+
+def get_no_of_advanced(param: dict) -> int:
+    return max(
+        (positions["end"] for positions in param.get("advance_to", {}).values()),
+        default=0,
+    )
+
+
+def synthesize(
+    rounds: dict[str, dict], team_ids: list[str], played: float, seed: int
+) -> tuple[dict[str, Team], dict[str, list[Match]], dict]:
+    rng = random.Random(seed)
+    team_ids = iter(rng.sample(team_ids, len(team_ids)))
+    teams, matches, groups = {}, defaultdict(list), {}
+
+    def new_team(name: str | int | None = None) -> Team:
+        name = next(team_ids) if name is None else name
+        teams[name] = Team(name, rng.gauss(0, 0.3), rng.gauss(0, 0.3))
+        return teams[name]
+
+    for name, param in rounds.items():
+        if param["format"] == "Season":
+            size = SWISS_SIZE if param["leg"] == "Swiss" else SEASON_SIZE
+            season_teams = [new_team() for _ in range(size)]
+            matches[name] = get_matches(season_teams, param["leg"], played, rng)
+
+        elif param["format"] == "Groups":
+            if "groups" in param:
+                _groups = {
+                    group: [new_team(team) for team in _teams]
+                    for group, _teams in param["groups"].items()
+                }
+            elif param["leg"] == "Swiss":
+                _groups = {
+                    f"Group {i}": [new_team() for _ in range(SWISS_SIZE // 3)]
+                    for i in range(2)
+                }
+                groups[name] = _groups
+            else:
+                _groups = {
+                    f"Group {i}": [new_team() for _ in range(GROUP_SIZE)]
+                    for i in range(math.ceil(get_no_of_advanced(param) / 2))
+                }
+                groups[name] = _groups
+            for _teams in _groups.values():
+                matches[name] += get_matches(_teams, param["leg"], played, rng)
+
+    return teams, matches, groups
+
+
+@contextmanager
+def time_rounds(timings: dict[str, float]):
+    methods = {
+        _format: round_type.simulate_batch
+        for _format, round_type in ROUND_TYPES.items()
+    }
+
+    def timed(_format: str, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            method(*args, **kwargs)
+            timings[_format] += time.perf_counter() - start
+
+        return wrapper
+
+    for _format, method in methods.items():
+        ROUND_TYPES[_format].simulate_batch = timed(_format, method)
+    try:
+        yield timings
+    finally:
+        for _format, method in methods.items():
+            ROUND_TYPES[_format].simulate_batch = method
+
+
+def benchmark(
+    rounds: dict[str, dict],
+    team_ids: list[str],
+    no_of_simulations: int,
+    played: float,
+    seed: int,
+) -> dict:
+    compile_plan(rounds)
+    teams, matches, groups = synthesize(rounds, team_ids, played, seed)
+    timings = defaultdict(float)
+
+    start = time.perf_counter()
+    with time_rounds(timings):
+        simulate_tournament(
+            rounds,
+            AVG_GOAL,
+            HOME_ADV,
+            teams,
+            matches,
+            groups,
+            no_of_simulations,
+            seed=seed,
+        )
+    elapsed = time.perf_counter() - start
+
+    teams, matches, groups = synthesize(rounds, team_ids, played, seed)
+    tracemalloc.start()
+    simulate_tournament(
+        rounds, AVG_GOAL, HOME_ADV, teams, matches, groups, no_of_simulations, seed=seed
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "teams": len(teams),
+        "simulations_per_sec": round(no_of_simulations / elapsed, 1),
+        "peak_memory_mb": round(peak / 2**20, 2),
+        "rounds": {_format: round(timings[_format], 4) for _format in sorted(timings)},
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]):
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        speedup = result["simulations_per_sec"] / baseline[name]["simulations_per_sec"]
+        memory = result["peak_memory_mb"] / baseline[name]["peak_memory_mb"]
+        print(f"{name}: {speedup=:.2f}x {memory=:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--simulations", type=int, default=10000)
+    parser.add_argument("--played", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--formats", nargs="*")
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    args = parser.parse_args()
+
+    team_ids = get_team_ids()
+    results = {}
+    for path in sorted((ASSETS / "simulation").glob("*.json")):
+        if args.formats and path.stem not in args.formats:
+            continue
+        rounds = json.loads(path.read_text())
+        results[path.stem] = benchmark(
+            rounds, team_ids, args.simulations, args.played, args.seed
+        )
+        print(path.stem, json.dumps(results[path.stem]))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+    if args.baseline:
+        compare(results, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
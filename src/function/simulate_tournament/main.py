@@ -1,7 +1,7 @@
 import json
 import logging
 import os
-from dataclasses import asdict
+import time
 
 import functions_framework
 from cloudevents.http.event import CloudEvent
@@ -11,14 +11,10 @@ from gcp.logging import setup_logging
 
 from gcp.util import decode_message
 from simulation import queries
-from simulation.models import Match, Team
-from simulation.tournaments import Groups, Knockout, Season, Winner
-
+from simulation.simulate import simulate_tournament
 
 setup_logging()
 
-Round = Groups | Knockout | Season | Winner
-
 
 @functions_framework.cloud_event
 def main(cloud_event: CloudEvent):
@@ -34,7 +30,10 @@ def main(cloud_event: CloudEvent):
     avg_goal, home_adv = factors["avg_goal"], factors["home_adv"]
     teams = queries.get_teams(league)
 
-    logging.info(f"Simulating: {league=}")
+    no_of_processes = int(os.environ.get("NO_OF_PROCESSES", 1))
+    tolerance = float(os.environ["TOLERANCE"]) if "TOLERANCE" in os.environ else None
+    logging.info(f"Simulating: {league=} {no_of_processes=}")
+    start = time.perf_counter()
     data = simulate_tournament(
         rounds,
         avg_goal,
@@ -42,112 +41,33 @@ def main(cloud_event: CloudEvent):
         teams,
         matches=queries.get_matches(league, teams),
         groups=queries.get_groups(league, teams),
+        no_of_processes=no_of_processes,
+        tolerance=tolerance,
     )
-    logging.info(f"Simulated: {league=}")
+    elapsed = time.perf_counter() - start
+    logging.info(f"Simulated: {league=} {elapsed=:.2f}")
 
+    hive_partitioning = {
+        "_LEAGUE": league,
+        "_DATE_UNIX": message["latest_match_date"],
+    }
     storage.upload_json_to_bucket(
         data,
         blob_name="league.json",
         bucket_name=os.environ["RESULT_BUCKET_NAME"],
-        hive_partitioning={
-            "_LEAGUE": league,
-            "_DATE_UNIX": message["latest_match_date"],
-        },
+        hive_partitioning=hive_partitioning,
     )
-
-
-def simulate_tournament(
-    rounds: dict[str, dict],
-    avg_goal: float,
-    home_adv: float,
-    teams: dict[str, Team],
-    matches: dict[str, list[Match]] | None = None,
-    groups: dict[dict[str, list[Team]]] | None = None,
-    no_of_simulations: int = 10000,
-):
-    round_objs: dict[str, Round] = {}
-    _groups = None
-
-    for name, param in rounds.items():
-        _format = param["format"]
-
-        if _format == "Groups":
-            _groups: dict[str, list[Team]] = groups.get(name) or {
-                group: [teams[team] for team in _teams]
-                for group, _teams in param["groups"].items()
-            }
-            round_objs[name] = Groups(
-                _groups,
-                avg_goal,
-                home_adv,
-                matches[name],
-                param["h2h"],
-                param["leg"],
-            )
-
-        elif _format == "Knockout":
-            round_objs[name] = Knockout(
-                name,
-                avg_goal,
-                home_adv,
-                matches[name],
-                param["leg"],
-                winning_teams={
-                    team
-                    for match in matches.get(param["advance_to"], [])
-                    for team in match.teams
-                },
-            )
-
-        elif _format == "Season":
-            round_objs[name] = Season(
-                teams.values(),
-                avg_goal,
-                home_adv,
-                matches[name],
-                param["h2h"],
-                param["leg"],
-            )
-
-        elif _format == "Winner":
-            round_objs[name] = Winner()
-
-    for _ in range(no_of_simulations):
-        for name, round_obj in round_objs.items():
-            round_obj.simulate()
-
-            if advance_to := rounds[name].get("advance_to"):
-                if isinstance(advance_to, str):
-                    round_objs[advance_to].add_teams(round_obj.get_advanced())
-                else:
-                    for name, positions in advance_to.items():
-                        round_objs[name].add_teams(round_obj.get_advanced(**positions))
-            round_obj.reset()
-
-    for team in teams.values():
-        team.sim_table /= no_of_simulations
-        team.sim_rounds /= no_of_simulations
-        team.sim_positions /= no_of_simulations
-
-    if groups:
-        return [
-            {
-                "team": team.name,
-                "group": group,
-                "positions": dict(team.sim_positions),
-                "rounds": dict(team.sim_rounds),
-                "table": asdict(team.sim_table),
-            }
-            for group, teams in _groups.items()
-            for team in teams
-        ]
-
-    return [
+    # Ratings used for this run, compared against by simulation_publish_messages
+    storage.upload_json_to_bucket(
         {
-            "team": team.name,
-            "positions": dict(team.sim_positions),
-            "rounds": dict(team.sim_rounds),
-            "table": asdict(team.sim_table),
-        }
-        for team in teams.values()
-    ]
+            "avg_goal": avg_goal,
+            "home_adv": home_adv,
+            "teams": {
+                name: {"offence": team.offence, "defence": team.defence}
+                for name, team in teams.items()
+            },
+        },
+        blob_name="inputs.json",
+        bucket_name=os.environ["RESULT_BUCKET_NAME"],
+        hive_partitioning=hive_partitioning,
+    )
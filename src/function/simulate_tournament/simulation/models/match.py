@@ -1,18 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import random
 import numpy as np
 
+from .table import Table
 from .team import Team
 
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     home_team: Team
     away_team: Team
     status: str = "incomplete"
     home_score: int = 0
     away_score: int = 0
+    _status: str = field(init=False, repr=False, compare=False)
+    _home_score: int = field(init=False, repr=False, compare=False)
+    _away_score: int = field(init=False, repr=False, compare=False)
+    _winning_team: Team | None = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         self._status = self.status
@@ -53,14 +58,18 @@ class Match:
             return self.away_team
         return self._winning_team
 
-    def _simulate(self, avg_goal: float, home_adv: float, extra_time: bool = False):
+    def expected_goals(
+        self, avg_goal: float, home_adv: float, extra_time: bool = False
+    ) -> tuple[float]:
         home_exp = avg_goal + home_adv + self.home_team.offence + self.away_team.defence
         away_exp = avg_goal - home_adv + self.away_team.offence + self.home_team.defence
         if extra_time:
             home_exp /= 3
             away_exp /= 3
-        home_exp = max(home_exp, 0.2)
-        away_exp = max(away_exp, 0.2)
+        return max(home_exp, 0.2), max(away_exp, 0.2)
+
+    def _simulate(self, avg_goal: float, home_adv: float, extra_time: bool = False):
+        home_exp, away_exp = self.expected_goals(avg_goal, home_adv, extra_time)
         self.home_score += np.random.poisson(home_exp)
         self.away_score += np.random.poisson(away_exp)
 
@@ -69,12 +78,12 @@ class Match:
 
     def simulate(self, avg_goal: float, home_adv: float, is_cup: bool = False):
         self._simulate(avg_goal, home_adv)
-        if self.winning_team or not is_cup:
+        if self.home_score != self.away_score or not is_cup:
             self.set_status_complete()
             return
 
         self._simulate(avg_goal, home_adv, extra_time=True)
-        if self.winning_team:
+        if self.home_score != self.away_score:
             self.set_status_complete()
             return
 
@@ -83,12 +92,11 @@ class Match:
 
     def log_teams_table(self, h2h=False):
         if h2h:
-            home_table = self.home_team.h2h_table
-            away_table = self.away_team.h2h_table
+            self.log_table(self.home_team.h2h_table, self.away_team.h2h_table)
         else:
-            home_table = self.home_team.table
-            away_table = self.away_team.table
+            self.log_table(self.home_team.table, self.away_team.table)
 
+    def log_table(self, home_table: Table, away_table: Table):
         if self.winning_team == self.home_team:
             home_table.wins += 1
             away_table.losses += 1
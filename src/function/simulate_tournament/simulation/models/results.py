@@ -5,6 +5,14 @@ class Results(defaultdict):
     def __init__(self):
         super().__init__(int)
 
+    def __reduce__(self):
+        return (self.__class__, (), None, None, iter(self.items()))
+
+    def __iadd__(self, other: "Results"):
+        for key, value in other.items():
+            self[key] += value
+        return self
+
     def __truediv__(self, other):
         for key in self:
             self[key] /= other
@@ -0,0 +1,106 @@
+from dataclasses import fields
+
+import numpy as np
+
+from .results import Results
+from .table import Table
+
+TABLE_FIELDS = [field.name for field in fields(Table)]
+
+
+def widen(array: np.ndarray, width: int) -> np.ndarray:
+    return np.pad(array, ((0, 0), (0, width - array.shape[1])))
+
+
+class State:
+    __slots__ = ("teams", "round_index", "table", "positions", "rounds")
+
+    def __init__(self, teams: list, round_keys: list[str] | None = None):
+        round_keys = round_keys or []
+        self.teams = teams
+        self.round_index = {key: i for i, key in enumerate(round_keys)}
+        self.table = np.zeros((len(teams), len(TABLE_FIELDS)), dtype=np.int64)
+        self.positions = np.zeros((len(teams), len(teams)), dtype=np.int64)
+        self.rounds = np.zeros((len(teams), len(round_keys)), dtype=np.int64)
+        for index, team in enumerate(teams):
+            team.bind(self, index)
+
+    def __iadd__(self, other: "State"):
+        for key in other.round_index:
+            self.get_round_index(key)
+        if other.positions.shape[1] > self.positions.shape[1]:
+            self.positions = widen(self.positions, other.positions.shape[1])
+
+        self.table += other.table
+        self.positions[:, : other.positions.shape[1]] += other.positions
+        for key, i in other.round_index.items():
+            self.rounds[:, self.round_index[key]] += other.rounds[:, i]
+        return self
+
+    def __itruediv__(self, other):
+        self.table = self.table / other
+        self.positions = self.positions / other
+        self.rounds = self.rounds / other
+        return self
+
+    def get_round_index(self, key: str) -> int:
+        if key not in self.round_index:
+            self.round_index[key] = len(self.round_index)
+            self.rounds = widen(self.rounds, len(self.round_index))
+        return self.round_index[key]
+
+    def log_table(self, index: int, table: Table):
+        self.table[index] += (
+            table.wins,
+            table.draws,
+            table.losses,
+            table.scored,
+            table.conceded,
+            table.correction,
+        )
+
+    def log_tables(self, index: int, counts: np.ndarray):
+        self.table[index] += counts
+
+    def log_positions(self, index: int, counts: np.ndarray):
+        if len(counts) > self.positions.shape[1]:
+            self.positions = widen(self.positions, len(counts))
+        self.positions[index, : len(counts)] += counts
+
+    def log_position(self, index: int, position: int):
+        if position > self.positions.shape[1]:
+            self.positions = widen(self.positions, position)
+        self.positions[index, position - 1] += 1
+
+    def log_round(self, index: int, key: str):
+        # Look up first: a new key replaces self.rounds with a wider array
+        i = self.get_round_index(key)
+        self.rounds[index, i] += 1
+
+    def log_rounds(self, key: str, teams: np.ndarray):
+        i = self.get_round_index(key)
+        self.rounds[:, i] += np.bincount(teams[teams >= 0], minlength=len(self.teams))
+
+    def get_table(self, index: int) -> Table:
+        return Table(*self.table[index].tolist())
+
+    def get_positions(self, index: int) -> Results:
+        results = Results()
+        for i, count in enumerate(self.positions[index].tolist(), 1):
+            if count:
+                results[f"_{i}"] = count
+        return results
+
+    def get_rounds(self, index: int) -> Results:
+        results = Results()
+        rounds = self.rounds[index].tolist()
+        for key, i in self.round_index.items():
+            if rounds[i]:
+                results[key] = rounds[i]
+        return results
+
+    def get_standard_error(self, no_of_simulations: int) -> float:
+        counts = np.hstack([self.positions, self.rounds]) / no_of_simulations
+        if not counts.size:
+            return 0.0
+        return float(np.sqrt(counts * (1 - counts) / no_of_simulations).max())
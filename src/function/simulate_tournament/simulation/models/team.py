@@ -1,21 +1,23 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .results import Results
+from .state import State
 from .table import Table
 
 
-@dataclass
+@dataclass(slots=True)
 class Team:
     name: str
     offence: float
     defence: float
+    table: Table = field(init=False, repr=False)
+    h2h_table: Table = field(init=False, repr=False)
+    state: State = field(init=False, repr=False)
+    index: int = field(init=False, repr=False)
 
     def __post_init__(self):
         self.table = Table()
         self.h2h_table = Table()
-        self.sim_table = Table()
-        self.sim_positions = Results()
-        self.sim_rounds = Results()
 
     def __eq__(self, other: "Team") -> bool:
         return other and self.name == other.name
@@ -26,17 +28,33 @@ class Team:
     def __hash__(self):
         return hash(self.name)
 
+    @property
+    def sim_table(self) -> Table:
+        return self.state.get_table(self.index)
+
+    @property
+    def sim_positions(self) -> Results:
+        return self.state.get_positions(self.index)
+
+    @property
+    def sim_rounds(self) -> Results:
+        return self.state.get_rounds(self.index)
+
+    def bind(self, state: State, index: int):
+        self.state = state
+        self.index = index
+
     def set_correction(self, value: int):
         self.table.correction = value
 
     def log_sim_table(self):
-        self.sim_table += self.table
+        self.state.log_table(self.index, self.table)
 
     def log_sim_positions(self, position: int):
-        self.sim_positions[f"_{position}"] += 1
+        self.state.log_position(self.index, position)
 
     def log_sim_rounds(self, _round: str):
-        self.sim_rounds[_round] += 1
+        self.state.log_round(self.index, _round)
 
     def reset(self):
         self.table.reset()
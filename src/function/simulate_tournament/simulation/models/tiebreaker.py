@@ -1,6 +1,12 @@
+import numpy as np
+
 from .team import Team
 
 
+def rank(keys: np.ndarray) -> np.ndarray:
+    return np.lexsort([-key for key in reversed(keys)], axis=-1)
+
+
 class TieBreaker:
     @staticmethod
     def h2h(team: Team) -> tuple:
@@ -0,0 +1,106 @@
+import sys
+from dataclasses import dataclass
+
+ADVANCE_FROM = {"Groups": dict, "Knockout": str, "Season": dict}
+ADVANCE_TO = {"Knockout", "Winner"}
+
+
+class InvalidRoundsError(ValueError):
+    pass
+
+
+def round_key(name: str) -> str:
+    return sys.intern(name.lower().replace(" ", "_").replace("-", "_"))
+
+
+@dataclass(frozen=True)
+class Advance:
+    target: int
+    args: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class Step:
+    name: str
+    param: dict
+    advance: tuple[Advance, ...] = ()
+
+    @property
+    def format(self) -> str:
+        return self.param["format"]
+
+
+def get_targets(name: str, param: dict) -> dict[str, tuple[int, ...]]:
+    advance_to = param.get("advance_to")
+    if advance_to is None:
+        return {}
+
+    _format = param["format"]
+    if not isinstance(advance_to, ADVANCE_FROM.get(_format, type(None))):
+        raise InvalidRoundsError(f"Invalid advance_to: {name=} {advance_to=}")
+    if isinstance(advance_to, str):
+        return {advance_to: ()}
+
+    targets = {}
+    for target, positions in advance_to.items():
+        start, end = positions.get("start", 1), positions.get("end")
+        if not (isinstance(start, int) and isinstance(end, int) and 1 <= start <= end):
+            raise InvalidRoundsError(f"Invalid positions: {name=} {target=}")
+        targets[target] = (end, start)
+    return targets
+
+
+def compile_plan(rounds: dict[str, dict]) -> list[Step]:
+    targets = {}
+    for name, param in rounds.items():
+        if param.get("format") not in (*ADVANCE_FROM, *ADVANCE_TO):
+            raise InvalidRoundsError(f"Invalid format: {name=}")
+        if param["format"] == "Knockout" and param.get("leg") not in (1, 2):
+            raise InvalidRoundsError(f"Invalid leg: {name=}")
+        if param["format"] == "Knockout" and "advance_to" not in param:
+            raise InvalidRoundsError(f"Missing advance_to: {name=}")
+
+        targets[name] = get_targets(name, param)
+        for target in targets[name]:
+            if target not in rounds:
+                raise InvalidRoundsError(f"Dangling advance_to: {name=} {target=}")
+            if rounds[target].get("format") not in ADVANCE_TO:
+                raise InvalidRoundsError(f"Invalid advance_to: {name=} {target=}")
+
+    indegree = {name: 0 for name in rounds}
+    for name in rounds:
+        for target in targets[name]:
+            indegree[target] += 1
+
+    order = []
+    ready = [name for name in rounds if not indegree[name]]
+    while ready:
+        name = ready.pop(0)
+        order.append(name)
+        for target in targets[name]:
+            indegree[target] -= 1
+            if not indegree[target]:
+                ready.append(target)
+
+    if len(order) < len(rounds):
+        raise InvalidRoundsError(f"Cyclic advance_to: {set(rounds) - set(order)}")
+
+    index = {name: i for i, name in enumerate(order)}
+    return [
+        Step(
+            name,
+            rounds[name],
+            tuple(
+                Advance(index[target], args) for target, args in targets[name].items()
+            ),
+        )
+        for name in order
+    ]
+
+
+def get_round_keys(plan: list[Step]) -> list[str]:
+    return [
+        round_key(step.name) if step.format == "Knockout" else "winner"
+        for step in plan
+        if step.format in ADVANCE_TO
+    ]
@@ -0,0 +1,42 @@
+from math import factorial
+
+import numpy as np
+
+MAX_GOALS = 20
+GOALS = np.arange(MAX_GOALS + 1)
+FACTORIALS = np.array([factorial(goals) for goals in GOALS], dtype=float)
+
+
+def poisson_pmf(exp: np.ndarray) -> np.ndarray:
+    exp = np.asarray(exp, dtype=float)[..., None]
+    return exp**GOALS * np.exp(-exp) / FACTORIALS
+
+
+def convolve(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    result = np.zeros((a.shape[0], a.shape[1] + b.shape[1] - 1))
+    for i in range(a.shape[1]):
+        result[:, i : i + b.shape[1]] += a[:, [i]] * b
+    return result
+
+
+def goal_diff_pmf(home_exp: np.ndarray, away_exp: np.ndarray) -> np.ndarray:
+    return convolve(poisson_pmf(home_exp), poisson_pmf(away_exp)[:, ::-1])
+
+
+def advance_probabilities(
+    lead: np.ndarray,
+    first_leg_exp: np.ndarray,
+    second_leg_exp: np.ndarray,
+    extra_time_exp: np.ndarray,
+) -> np.ndarray:
+    regulation_pmf = convolve(
+        goal_diff_pmf(*first_leg_exp.T), goal_diff_pmf(*second_leg_exp.T)
+    )
+    diffs = np.arange(-2 * MAX_GOALS, 2 * MAX_GOALS + 1) + np.asarray(lead)[:, None]
+    win = (regulation_pmf * (diffs > 0)).sum(axis=1)
+    draw = (regulation_pmf * (diffs == 0)).sum(axis=1)
+
+    # Extra time is only played when the tie is level after regulation
+    extra_time_pmf = goal_diff_pmf(*extra_time_exp.T)
+    extra_time_win = extra_time_pmf[:, MAX_GOALS + 1 :].sum(axis=1)
+    return win + draw * (extra_time_win + extra_time_pmf[:, MAX_GOALS] / 2)
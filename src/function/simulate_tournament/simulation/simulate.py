@@ -0,0 +1,299 @@
+import logging
+import math
+import random
+from collections import defaultdict
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing import get_context
+
+import numpy as np
+
+from simulation.models import Match, Team
+from simulation.models.state import State
+from simulation.plan import Step, compile_plan, get_round_keys
+from simulation.tournaments import (
+    Groups,
+    Knockout,
+    Season,
+    VectorizedKnockout,
+    VectorizedSeason,
+    Winner,
+)
+from simulation.tournaments.vectorized_season import BATCH_SIZE
+
+Round = Groups | Knockout | Season | Winner
+
+
+def get_groups(
+    name: str,
+    param: dict,
+    teams: dict[str, Team],
+    groups: dict[str, dict[str, list[Team]]],
+) -> dict[str, list[Team]]:
+    return groups.get(name) or {
+        group: [teams[team] for team in _teams]
+        for group, _teams in param["groups"].items()
+    }
+
+
+def get_round_objs(
+    plan: list[Step],
+    avg_goal: float,
+    home_adv: float,
+    teams: dict[str, Team],
+    matches: dict[str, list[Match]],
+    groups: dict[str, dict[str, list[Team]]],
+    state: State,
+) -> list[Round]:
+    round_objs: list[Round] = []
+
+    for step in plan:
+        name, param = step.name, step.param
+
+        if step.format == "Groups":
+            round_objs.append(
+                Groups(
+                    get_groups(name, param, teams, groups),
+                    avg_goal,
+                    home_adv,
+                    matches[name],
+                    param["h2h"],
+                    param["leg"],
+                )
+            )
+
+        elif step.format == "Knockout":
+            round_objs.append(
+                VectorizedKnockout(
+                    name,
+                    avg_goal,
+                    home_adv,
+                    matches[name],
+                    param["leg"],
+                    winning_teams={
+                        team
+                        for match in matches.get(param["advance_to"], [])
+                        for team in match.teams
+                    },
+                    state=state,
+                )
+            )
+
+        elif step.format == "Season":
+            round_objs.append(
+                VectorizedSeason(
+                    teams.values(),
+                    avg_goal,
+                    home_adv,
+                    matches[name],
+                    param["h2h"],
+                    param["leg"],
+                    state,
+                )
+            )
+
+        elif step.format == "Winner":
+            round_objs.append(Winner(state))
+
+    return round_objs
+
+
+def run_simulations(plan: list[Step], round_objs: list[Round], no_of_simulations: int):
+    for simulated in range(0, no_of_simulations, BATCH_SIZE):
+        size = min(BATCH_SIZE, no_of_simulations - simulated)
+        for step, round_obj in zip(plan, round_objs):
+            round_obj.simulate_batch(size)
+            for advance in step.advance:
+                round_objs[advance.target].add_teams_batch(
+                    round_obj.get_advanced_batch(*advance.args)
+                )
+
+
+def get_seeds(seed: int | None, no_of_shards: int) -> list[int]:
+    return [
+        int(child.generate_state(1)[0])
+        for child in np.random.SeedSequence(seed).spawn(no_of_shards)
+    ]
+
+
+def seed_random(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def get_pool(no_of_processes: int) -> ProcessPoolExecutor | None:
+    if no_of_processes > 1:
+        return ProcessPoolExecutor(no_of_processes, mp_context=get_context("spawn"))
+    return None
+
+
+def simulate_shard(
+    plan: list[Step],
+    avg_goal: float,
+    home_adv: float,
+    teams: dict[str, Team],
+    matches: dict[str, list[Match]],
+    groups: dict[str, dict[str, list[Team]]],
+    no_of_simulations: int,
+    seed: int,
+) -> State:
+    seed_random(seed)
+    state = State(list(teams.values()), get_round_keys(plan))
+    round_objs = get_round_objs(plan, avg_goal, home_adv, teams, matches, groups, state)
+    run_simulations(plan, round_objs, no_of_simulations)
+    return state
+
+
+def simulate_parallel(
+    plan: list[Step],
+    avg_goal: float,
+    home_adv: float,
+    teams: dict[str, Team],
+    matches: dict[str, list[Match]],
+    groups: dict[str, dict[str, list[Team]]],
+    no_of_simulations: int,
+    state: State,
+    pool: ProcessPoolExecutor,
+    no_of_shards: int,
+    seed: int | None = None,
+):
+    shards = [
+        no_of_simulations // no_of_shards + (i < no_of_simulations % no_of_shards)
+        for i in range(no_of_shards)
+    ]
+    seeds = get_seeds(seed, no_of_shards)
+    groups = {name: dict(_groups) for name, _groups in groups.items()}
+
+    futures = [
+        pool.submit(
+            simulate_shard,
+            plan,
+            avg_goal,
+            home_adv,
+            teams,
+            matches,
+            groups,
+            size,
+            shard_seed,
+        )
+        for size, shard_seed in zip(shards, seeds)
+        if size
+    ]
+    for future in futures:
+        state += future.result()
+
+
+def simulate(
+    plan: list[Step],
+    avg_goal: float,
+    home_adv: float,
+    teams: dict[str, Team],
+    matches: dict[str, list[Match]],
+    groups: dict[str, dict[str, list[Team]]],
+    no_of_simulations: int,
+    state: State,
+    pool: ProcessPoolExecutor | None = None,
+    no_of_processes: int = 1,
+    seed: int | None = None,
+):
+    if pool:
+        simulate_parallel(
+            plan,
+            avg_goal,
+            home_adv,
+            teams,
+            matches,
+            groups,
+            no_of_simulations,
+            state,
+            pool,
+            no_of_processes,
+            seed,
+        )
+        return
+
+    if seed is not None:
+        seed_random(get_seeds(seed, 1)[0])
+    round_objs = get_round_objs(plan, avg_goal, home_adv, teams, matches, groups, state)
+    run_simulations(plan, round_objs, no_of_simulations)
+
+
+def simulate_tournament(
+    rounds: dict[str, dict],
+    avg_goal: float,
+    home_adv: float,
+    teams: dict[str, Team],
+    matches: dict[str, list[Match]] | None = None,
+    groups: dict[dict[str, list[Team]]] | None = None,
+    no_of_simulations: int = 10000,
+    no_of_processes: int = 1,
+    seed: int | None = None,
+    tolerance: float | None = None,
+    batch_size: int = 1000,
+):
+    matches = matches or defaultdict(list)
+    groups = groups or {}
+    plan = compile_plan(rounds)
+    state = State(list(teams.values()), get_round_keys(plan))
+
+    simulated = 0
+    standard_error = 0.0
+    batch_size = batch_size if tolerance is not None else max(no_of_simulations, 1)
+    with get_pool(no_of_processes) or nullcontext() as pool:
+        for batch_seed in get_seeds(seed, math.ceil(no_of_simulations / batch_size)):
+            size = min(batch_size, no_of_simulations - simulated)
+            simulate(
+                plan,
+                avg_goal,
+                home_adv,
+                teams,
+                matches,
+                groups,
+                size,
+                state,
+                pool,
+                no_of_processes,
+                batch_seed if seed is not None else None,
+            )
+            simulated += size
+            standard_error = state.get_standard_error(simulated)
+            if tolerance is not None and standard_error <= tolerance:
+                break
+
+    logging.info(f"Simulation error: {simulated=} {standard_error=:.4f}")
+
+    if simulated:
+        state /= simulated
+
+    if groups:
+        _groups = next(
+            get_groups(name, param, teams, groups)
+            for name, param in rounds.items()
+            if param["format"] == "Groups"
+        )
+        return [
+            {
+                "team": team.name,
+                "group": group,
+                "positions": dict(team.sim_positions),
+                "rounds": dict(team.sim_rounds),
+                "table": asdict(team.sim_table),
+                "simulations": simulated,
+                "standard_error": standard_error,
+            }
+            for group, teams in _groups.items()
+            for team in teams
+        ]
+
+    return [
+        {
+            "team": team.name,
+            "positions": dict(team.sim_positions),
+            "rounds": dict(team.sim_rounds),
+            "table": asdict(team.sim_table),
+            "simulations": simulated,
+            "standard_error": standard_error,
+        }
+        for team in teams.values()
+    ]
@@ -2,3 +2,5 @@ from .groups import Groups
 from .knockout import Knockout
 from .season import Season
 from .winner import Winner
+from .vectorized_season import VectorizedSeason
+from .vectorized_knockout import VectorizedKnockout
@@ -1,6 +1,8 @@
 from collections import defaultdict
 from dataclasses import dataclass
 
+import numpy as np
+
 from simulation.models import Match, TieBreaker, Team
 from .season import Season
 
@@ -59,9 +61,20 @@ class Groups:
             for position, team in enumerate(group.positions, 1):
                 self._positions[position].append(team)
 
+    def simulate_batch(self, no_of_simulations: int):
+        orders = []
+        for _ in range(no_of_simulations):
+            self.simulate()
+            orders.append([team.index for team in self.positions])
+            self.reset()
+        self._orders = np.array(orders, dtype=int)
+
     def get_advanced(self, end: int, start: int = 1) -> list[Team]:
         return self.positions[start - 1 : end]
 
+    def get_advanced_batch(self, end: int, start: int = 1) -> np.ndarray:
+        return self._orders[:, start - 1 : end]
+
     def reset(self):
         self.matches = self._matches.copy()
         self._positions = defaultdict(list)
@@ -2,7 +2,11 @@ import random
 from collections import defaultdict
 from dataclasses import dataclass
 
+import numpy as np
+
 from simulation.models import Match, Team
+from simulation.plan import round_key
+from simulation.probabilities import advance_probabilities
 
 
 @dataclass
@@ -18,11 +22,10 @@ class Knockout:
         if not self.leg in (1, 2):
             raise ValueError
 
-        self.teams: list[Team] = []
+        self.key = round_key(self.name)
         self.matches = self.matches or []
         self.winning_teams = self.winning_teams or set()
-        self._matches = self.matches.copy()
-        self._winning_teams = self.winning_teams.copy()
+        self._probabilities: dict[tuple, float] = {}
 
     @property
     def _home_adv(self):
@@ -30,12 +33,6 @@ class Knockout:
             return 0
         return self.home_adv
 
-    def add_teams(self, teams: list[Team]):
-        name = self.name.lower().replace(" ", "_").replace("-", "_")
-        for team in teams:
-            self.teams.append(team)
-            team.log_sim_rounds(name)
-
     @staticmethod
     def draw_series(
         teams: set[Team], scheduled_matches: list[Match], leg: int = 2
@@ -58,26 +55,46 @@ class Knockout:
 
         return series
 
-    def simulate(self):
-        series = self.draw_series(self.teams, self.matches, self.leg)
-        for matches in series.values():
-            if self.leg == 2:
-                leg1, leg2 = matches[0], matches[1]
-                if not leg1.is_complete:
-                    leg1.simulate(self.avg_goal, self.home_adv)
-                agg = leg1 + leg2
-            else:
-                agg = matches[0]
-
-            if not agg.is_complete:
-                agg.simulate(self.avg_goal, self.home_adv, is_cup=True)
-
-            self.winning_teams.add(agg.winning_team)
-
-    def get_advanced(self) -> list[Team]:
-        return self.winning_teams
-
-    def reset(self):
-        self.teams = []
-        self.matches = self._matches.copy()
-        self.winning_teams = self._winning_teams.copy()
+    def get_tie(self, matches: list[Match]) -> tuple[Match, tuple]:
+        agg = matches[0] + matches[1] if self.leg == 2 else matches[0]
+        return agg, (
+            agg.home_team,
+            agg.away_team,
+            agg.home_score - agg.away_score,
+            self.leg == 2 and not matches[0].is_complete,
+            not matches[-1].is_complete,
+        )
+
+    def get_probabilities(self, ties: list[tuple]) -> np.ndarray:
+        new_ties = [
+            tie for tie in dict.fromkeys(ties) if tie not in self._probabilities
+        ]
+        if new_ties:
+            no_goals = (0, 0)
+            first_leg_exp, second_leg_exp, extra_time_exp = [], [], []
+            for home_team, away_team, _, first_leg, second_leg in new_ties:
+                first_leg_match = Match(away_team, home_team)
+                match = Match(home_team, away_team)
+                first_leg_exp.append(
+                    first_leg_match.expected_goals(self.avg_goal, self.home_adv)[::-1]
+                    if first_leg
+                    else no_goals
+                )
+                second_leg_exp.append(
+                    match.expected_goals(self.avg_goal, self.home_adv)
+                    if second_leg
+                    else no_goals
+                )
+                extra_time_exp.append(
+                    match.expected_goals(self.avg_goal, self.home_adv, extra_time=True)
+                    if second_leg
+                    else no_goals
+                )
+            probabilities = advance_probabilities(
+                np.array([tie[2] for tie in new_ties]),
+                np.array(first_leg_exp),
+                np.array(second_leg_exp),
+                np.array(extra_time_exp),
+            )
+            self._probabilities.update(zip(new_ties, probabilities))
+        return np.array([self._probabilities[tie] for tie in ties])
@@ -1,9 +1,13 @@
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from functools import partial
 from itertools import combinations, permutations
 
+import numpy as np
+
 from simulation.models import Team, TieBreaker, Match
+from simulation.models.tiebreaker import rank
+from simulation.models.table import Table
 
 
 @dataclass
@@ -17,6 +21,27 @@ class Season:
 
     def __post_init__(self):
         self.matches = self.matches or self.scheduling(self.teams)
+        self._incomplete_matches = [
+            match for match in self.matches if not match.is_complete
+        ]
+        self._fixtures = self.get_fixtures()
+        self._baseline = self.get_baseline()
+        self.reset()
+
+    def get_fixtures(self) -> dict[frozenset[Team], list[Match]]:
+        fixtures = defaultdict(list)
+        for match in self.matches:
+            fixtures[frozenset(match.teams)].append(match)
+        return fixtures
+
+    def get_baseline(self) -> dict[Team, Table]:
+        baseline = {
+            team: Table(correction=team.table.correction) for team in self.teams
+        }
+        for match in self.matches:
+            if match.is_complete:
+                match.log_table(baseline[match.home_team], baseline[match.away_team])
+        return baseline
 
     @property
     def scheduling(self):
@@ -38,28 +63,29 @@ class Season:
 
     @property
     def positions(self) -> list[Team]:
+        if self._positions is None:
+            self._positions = self.get_positions()
+        return self._positions
+
+    def log_h2h_tables(self):
         points = defaultdict(list)
         for team in self.teams:
             points[team.table.points].append(team)
 
+        for teams in points.values():
+            for pair in combinations(teams, 2):
+                for match in self._fixtures.get(frozenset(pair), []):
+                    match.log_teams_table(h2h=True)
+
+    def get_positions(self) -> list[Team]:
         if self.h2h:
-            for teams in points.values():
-                if len(teams) < 2:
-                    continue
-                for match in self.matches:
-                    if match.home_team in teams and match.away_team in teams:
-                        match.log_teams_table(h2h=True)
-
-        return sorted(
-            self.teams,
-            key=self.tiebreaker,
-            reverse=True,
-        )
+            self.log_h2h_tables()
+        keys = np.array([self.tiebreaker(team) for team in self.teams]).T
+        return [self.teams[i] for i in rank(keys)]
 
     def simulate(self):
-        for match in self.matches:
-            if not match.is_complete:
-                match.simulate(self.avg_goal, self.home_adv)
+        for match in self._incomplete_matches:
+            match.simulate(self.avg_goal, self.home_adv)
             match.log_teams_table()
 
         for position, team in enumerate(self.positions, 1):
@@ -70,7 +96,9 @@ class Season:
         return self.positions[start - 1 : end]
 
     def reset(self):
-        for match in self.matches:
+        self._positions = None
+        for match in self._incomplete_matches:
             match.reset()
         for team in self.teams:
             team.reset()
+            team.table = replace(self._baseline[team])
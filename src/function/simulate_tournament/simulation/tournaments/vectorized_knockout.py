@@ -0,0 +1,115 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulation.models.state import State
+from .knockout import Knockout
+
+
+@dataclass
+class VectorizedKnockout(Knockout):
+    state: State | None = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        size = len(self.state.teams)
+        self._entrants: list[np.ndarray] = []
+        self._pair_probabilities = np.zeros((size, size))
+        self._paired = np.zeros(size, dtype=bool)
+        self._winning = np.array([team.index for team in self.winning_teams], dtype=int)
+
+        scheduled_home, scheduled_away, scheduled_probabilities = [], [], []
+        for matches in self.draw_series([], self.matches, self.leg).values():
+            agg, tie = self.get_tie(matches)
+            home_team, away_team = agg.home_team, agg.away_team
+            scheduled_home.append(home_team.index)
+            scheduled_away.append(away_team.index)
+            if home_team in self.winning_teams or away_team in self.winning_teams:
+                scheduled_probabilities.append(float(home_team in self.winning_teams))
+            elif agg.is_complete:
+                scheduled_probabilities.append(float(agg.winning_team == home_team))
+            else:
+                scheduled_probabilities.append(self.get_probabilities([tie])[0])
+        self._scheduled_home = np.array(scheduled_home, dtype=int)
+        self._scheduled_away = np.array(scheduled_away, dtype=int)
+        self._scheduled_probabilities = np.array(scheduled_probabilities)
+        self._scheduled_teams = np.concatenate(
+            [self._scheduled_home, self._scheduled_away]
+        )
+        self._byes = self._winning[~np.isin(self._winning, self._scheduled_teams)]
+        self._advanced = np.empty((0, 0), dtype=int)
+
+    def add_teams_batch(self, teams: np.ndarray):
+        self._entrants.append(teams)
+        self.state.log_rounds(self.key, teams)
+
+    def add_pair_probabilities(self, teams: np.ndarray):
+        new_teams = np.unique(teams[~self._paired[teams]])
+        if not new_teams.size:
+            return
+        self._paired[new_teams] = True
+        paired = np.flatnonzero(self._paired)
+        home, away = np.meshgrid(paired, paired, indexing="ij")
+        pairs = (home != away) & (np.isin(home, new_teams) | np.isin(away, new_teams))
+        home, away = home[pairs], away[pairs]
+        self._pair_probabilities[home, away] = self.get_probabilities(
+            [
+                (self.state.teams[i], self.state.teams[j], 0, self.leg == 2, True)
+                for i, j in zip(home.tolist(), away.tolist())
+            ]
+        )
+
+    def draw_ties(self, entrants: np.ndarray) -> tuple[np.ndarray]:
+        undrawn = (entrants >= 0) & ~np.isin(entrants, self._scheduled_teams)
+        no_of_undrawn = undrawn.sum(axis=1)
+        if (no_of_undrawn % 2).any():
+            raise ValueError("Odd number of undrawn teams")
+
+        keys = np.where(undrawn, np.random.random(entrants.shape), 2)
+        drawn = np.take_along_axis(entrants, np.argsort(keys, axis=1), axis=1)
+        width = entrants.shape[1] // 2 * 2
+        home, away = drawn[:, 0:width:2], drawn[:, 1:width:2]
+        is_tie = np.arange(1, width, 2) < no_of_undrawn[:, None]
+        if self.leg == 2:
+            home, away = away, home
+        return np.where(is_tie, home, -1), np.where(is_tie, away, -1)
+
+    def simulate_batch(self, no_of_simulations: int):
+        entrants = (
+            np.hstack(self._entrants)
+            if self._entrants
+            else np.empty((no_of_simulations, 0), dtype=int)
+        )
+        self._entrants = []
+
+        self.add_pair_probabilities(entrants[entrants >= 0])
+        home, away = self.draw_ties(entrants)
+        probabilities = np.where(
+            np.isin(home, self._winning),
+            1,
+            np.where(
+                np.isin(away, self._winning),
+                0,
+                self._pair_probabilities[home.clip(0), away.clip(0)],
+            ),
+        )
+        winners = np.where(
+            home >= 0,
+            np.where(np.random.random(home.shape) < probabilities, home, away),
+            -1,
+        )
+
+        scheduled_shape = (no_of_simulations, len(self._scheduled_probabilities))
+        scheduled_winners = np.where(
+            np.random.random(scheduled_shape) < self._scheduled_probabilities,
+            self._scheduled_home,
+            self._scheduled_away,
+        )
+
+        byes = np.where(
+            (entrants[:, :, None] == self._byes).any(axis=1), -1, self._byes
+        )
+        self._advanced = np.hstack([scheduled_winners, winners, byes])
+
+    def get_advanced_batch(self) -> np.ndarray:
+        return self._advanced
@@ -0,0 +1,147 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulation.models.state import State
+from simulation.models.tiebreaker import rank
+from .season import Season
+
+BATCH_SIZE = 1000
+
+
+def scatter_add(values: np.ndarray, index: np.ndarray, size: int) -> np.ndarray:
+    sims = values.shape[0]
+    flat_index = (np.arange(sims)[:, None] * size + index).ravel()
+    return np.bincount(
+        flat_index, weights=values.ravel(), minlength=sims * size
+    ).reshape(sims, size)
+
+
+@dataclass
+class VectorizedSeason(Season):
+    state: State | None = None
+
+    def __post_init__(self):
+        super().__post_init__()
+        self.teams = list(self.teams)
+        self._state_index = np.array([team.index for team in self.teams], dtype=int)
+        index = {team: i for i, team in enumerate(self.teams)}
+        complete_matches = [match for match in self.matches if match.is_complete]
+        matches = complete_matches + self._incomplete_matches
+        self._no_of_complete = len(complete_matches)
+
+        self._home = np.array([index[m.home_team] for m in matches], dtype=int)
+        self._away = np.array([index[m.away_team] for m in matches], dtype=int)
+        self._home_score = np.array([m.home_score for m in complete_matches], dtype=int)
+        self._away_score = np.array([m.away_score for m in complete_matches], dtype=int)
+        self._baseline = np.array(
+            [
+                [
+                    self._baseline[team].wins,
+                    self._baseline[team].draws,
+                    self._baseline[team].losses,
+                    self._baseline[team].scored,
+                    self._baseline[team].conceded,
+                ]
+                for team in self.teams
+            ],
+            dtype=int,
+        ).reshape(len(self.teams), 5)
+        self._correction = np.array([t.table.correction for t in self.teams], dtype=int)
+
+        offence = np.array([t.offence for t in self.teams], dtype=float)
+        defence = np.array([t.defence for t in self.teams], dtype=float)
+        home = self._home[self._no_of_complete :]
+        away = self._away[self._no_of_complete :]
+        self._home_exp = np.maximum(
+            self.avg_goal + self.home_adv + offence[home] + defence[away], 0.2
+        )
+        self._away_exp = np.maximum(
+            self.avg_goal - self.home_adv + offence[away] + defence[home], 0.2
+        )
+
+        self._orders = np.empty((0, len(self.teams)), dtype=int)
+
+    def get_tables(
+        self,
+        home: np.ndarray,
+        away: np.ndarray,
+        home_score: np.ndarray,
+        away_score: np.ndarray,
+        weight: np.ndarray | None = None,
+    ) -> np.ndarray:
+        weight = np.ones_like(home_score) if weight is None else weight
+        home_win = (home_score > away_score) * weight
+        away_win = (away_score > home_score) * weight
+        draw = (home_score == away_score) * weight
+        home_score, away_score = home_score * weight, away_score * weight
+        size = len(self.teams)
+        return np.stack(
+            [
+                scatter_add(home_win, home, size) + scatter_add(away_win, away, size),
+                scatter_add(draw, home, size) + scatter_add(draw, away, size),
+                scatter_add(away_win, home, size) + scatter_add(home_win, away, size),
+                scatter_add(home_score, home, size)
+                + scatter_add(away_score, away, size),
+                scatter_add(away_score, home, size)
+                + scatter_add(home_score, away, size),
+            ],
+            axis=-1,
+        ).astype(int)
+
+    def get_orders(
+        self, tables: np.ndarray, home_score: np.ndarray, away_score: np.ndarray
+    ) -> np.ndarray:
+        wins, draws, _, scored, conceded = np.moveaxis(tables, -1, 0)
+        points = wins * 3 + draws + self._correction
+        keys = [points]
+
+        if self.h2h:
+            shape = (len(tables), self._no_of_complete)
+            home_score = np.hstack(
+                [np.broadcast_to(self._home_score, shape), home_score]
+            )
+            away_score = np.hstack(
+                [np.broadcast_to(self._away_score, shape), away_score]
+            )
+            tied = points[:, self._home] == points[:, self._away]
+            h2h_wins, h2h_draws, _, h2h_scored, h2h_conceded = np.moveaxis(
+                self.get_tables(
+                    self._home, self._away, home_score, away_score, weight=tied
+                ),
+                -1,
+                0,
+            )
+            keys += [h2h_wins * 3 + h2h_draws, h2h_scored - h2h_conceded, h2h_scored]
+
+        keys += [scored - conceded, scored]
+        return rank(keys)
+
+    def simulate_batch(self, no_of_simulations: int):
+        shape = (no_of_simulations, self._home_exp.size)
+        home_score = np.random.poisson(self._home_exp, size=shape)
+        away_score = np.random.poisson(self._away_exp, size=shape)
+
+        tables = self._baseline + self.get_tables(
+            self._home[self._no_of_complete :],
+            self._away[self._no_of_complete :],
+            home_score,
+            away_score,
+        )
+        self._orders = self.get_orders(tables, home_score, away_score)
+
+        size = len(self.teams)
+        sim_tables = tables.sum(axis=0)
+        sim_positions = np.bincount(
+            (self._orders * size + np.arange(size)).ravel(), minlength=size * size
+        ).reshape(size, size)
+        for i, team in enumerate(self.teams):
+            correction = self._correction[i] * no_of_simulations
+            self.state.log_tables(team.index, np.append(sim_tables[i], correction))
+            self.state.log_positions(team.index, sim_positions[i])
+
+    def get_advanced_batch(self, end: int, start: int = 1) -> np.ndarray:
+        return self._state_index[self._orders[:, start - 1 : end]]
+
+    def reset(self):
+        pass
@@ -1,10 +1,15 @@
 from dataclasses import dataclass
 
+import numpy as np
+
 from simulation.models import Team
+from simulation.models.state import State
 
 
 @dataclass
 class Winner:
+    state: State | None = None
+
     def __post_init__(self):
         self.teams: list[Team] = []
 
@@ -13,8 +18,14 @@ class Winner:
             self.teams.append(team)
             team.log_sim_rounds("winner")
 
+    def add_teams_batch(self, teams: np.ndarray):
+        self.state.log_rounds("winner", teams)
+
     def simulate(self):
         pass
 
+    def simulate_batch(self, no_of_simulations: int):
+        pass
+
     def reset(self):
         self.teams = []
@@ -0,0 +1,5 @@
+import google.cloud.logging
+
+
+def setup_logging():
+    google.cloud.logging.Client().setup_logging()
@@ -1,26 +1,106 @@
+import json
+import logging
+import math
 import os
 import re
 
 import functions_framework
 from cloudevents.http.event import CloudEvent
+from google.api_core.exceptions import NotFound
 
-from gcp import bigquery, pubsub
+from gcp import bigquery, pubsub, storage
+from gcp.logging import setup_logging
+
+setup_logging()
+
+
+def get_inputs(league: str) -> dict:
+    factors = bigquery.query_dict(
+        query="SELECT * FROM `simulation.get_avg_goal_home_adv`(@league);",
+        params={"league": league},
+    )[0]
+    teams = bigquery.query_dict(
+        query="SELECT * FROM `simulation.get_teams`(@league);",
+        params={"league": league},
+    )
+    return {
+        "avg_goal": factors["avg_goal"],
+        "home_adv": factors["home_adv"],
+        "teams": {
+            str(team["name"]): {"offence": team["offence"], "defence": team["defence"]}
+            for team in teams
+        },
+    }
+
+
+def get_previous_inputs(league: str, last_run: int) -> dict | None:
+    try:
+        return json.loads(
+            storage.download_blob(
+                blob_name=storage.get_directory(
+                    "inputs.json", {"_LEAGUE": league, "_DATE_UNIX": last_run}
+                ),
+                bucket_name=os.environ["RESULT_BUCKET_NAME"],
+            )
+        )
+    except NotFound:
+        return None
+
+
+def get_change(inputs: dict, previous_inputs: dict) -> float:
+    if inputs["teams"].keys() != previous_inputs["teams"].keys():
+        return math.inf
+    return max(
+        abs(inputs["avg_goal"] - previous_inputs["avg_goal"]),
+        abs(inputs["home_adv"] - previous_inputs["home_adv"]),
+        *(
+            abs(team[rating] - previous_inputs["teams"][name][rating])
+            for name, team in inputs["teams"].items()
+            for rating in ("offence", "defence")
+        ),
+    )
+
+
+def is_changed(league: dict, threshold: float) -> bool:
+    # New results always need a run; the threshold only applies without them
+    if not league["last_run"] or league["latest_match_date"] > league["last_run"]:
+        return True
+
+    name = league["footystats_name"]
+    previous_inputs = get_previous_inputs(name, league["last_run"])
+    if previous_inputs is None:
+        return True
+
+    change = get_change(get_inputs(name), previous_inputs)
+    logging.info(f"Rating change: league={name} {change=:.4f}")
+    return change >= threshold
 
 
 @functions_framework.cloud_event
 def main(cloud_event: CloudEvent):
-    _type, table = re.match(
+    match = re.match(
         r"_TYPE=(\w+)\/_DATE_UNIX=\d+\/(\w+)\.json", cloud_event.data["name"]
-    ).groups()
+    )
+    if match is None:
+        return
 
+    _type, table = match.groups()
     if table != "teams":
         return
 
     leagues = bigquery.query_dict(
         query="SELECT * FROM `simulation.get_messages`(@type);", params={"type": _type}
     )
+    threshold = float(os.environ.get("RATING_CHANGE_THRESHOLD", 0.02))
+    skipped = 0
     for league in leagues:
+        if not is_changed(league, threshold):
+            skipped += 1
+            continue
         pubsub.publish_json_message(
             topic=os.environ["TOPIC_NAME"],
             data=league,
         )
+    logging.info(
+        f"Simulation fan-out: {_type=} published={len(leagues) - skipped} {skipped=}"
+    )
@@ -0,0 +1,99 @@
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import numpy as np
+
+from gcp import storage
+from solver import history, matrix, queries
+
+
+def get_timestamp(date: str) -> int:
+    return int(
+        datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+    )
+
+
+def solve_days(
+    match_history: history.History,
+    _type: str,
+    max_times: list[int],
+    bucket_name: str,
+) -> list[tuple[int, float]]:
+    logging.basicConfig(level=logging.INFO)
+    warm_start, timings = None, []
+    for max_time in max_times:
+        start = time.perf_counter()
+        problem = history.get_snapshot(match_history, max_time)
+        results, warm_start = matrix.solver(problem, warm_start)
+        for name, data in results.items():
+            storage.upload_json_to_bucket(
+                data,
+                blob_name=f"{name}.json",
+                bucket_name=bucket_name,
+                hive_partitioning={"_TYPE": _type, "_DATE_UNIX": max_time},
+            )
+        timings.append((max_time, time.perf_counter() - start))
+    return timings
+
+
+def backfill(
+    _type: str,
+    start_time: int,
+    end_time: int,
+    bucket_name: str,
+    no_of_processes: int = 1,
+):
+    rows = queries.get_match_history(_type, start_time, end_time)
+    match_history = history.get_history(rows)
+    max_times = history.get_max_times(match_history, start_time, end_time)
+    logging.info(f"Backfill: {_type=} matches={len(rows)} days={len(max_times)}")
+    for day in history.get_days_without_matches(max_times, start_time, end_time):
+        date = datetime.fromtimestamp(day, timezone.utc).date()
+        logging.info(f"No snapshot: {date=} has no new match")
+    if not len(max_times):
+        return
+
+    # Each worker walks a run of consecutive days so every solve but the first
+    # starts from the previous day's basis
+    chunks = [
+        chunk.tolist()
+        for chunk in np.array_split(max_times, min(no_of_processes, len(max_times)))
+    ]
+    with ProcessPoolExecutor(
+        no_of_processes, mp_context=get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(solve_days, match_history, _type, chunk, bucket_name)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            for max_time, elapsed in future.result():
+                logging.info(f"Backfilled: {max_time=} {elapsed=:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--type", default="Club")
+    parser.add_argument("--start", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--end", required=True, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--bucket", default=os.environ.get("BUCKET_NAME"))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    backfill(
+        args.type,
+        get_timestamp(args.start),
+        get_timestamp(args.end) + history.SECONDS_PER_DAY,
+        args.bucket,
+        args.processes,
+    )
+
+
+if __name__ == "__main__":
+    main()
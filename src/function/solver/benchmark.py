@@ -0,0 +1,205 @@
+import argparse
+import json
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+from pulp import PULP_CBC_CMD
+
+from solver import matrix, models, solver
+
+SCALES = ["50:1000", "500:10000", "2000:100000", "5000:500000"]
+BACKENDS = ["matrix", "pulp"]
+LEAGUE_SIZE = 20
+LEAGUES_PER_CUP = 10
+CUP_SHARE = 0.05
+AVG_GOAL = 1.35
+HOME_ADV = 0.15
+NOISE = 0.6
+MEMORY_LIMIT_MB = 1024
+TIMEOUT_S = 540
+
+
+def get_rows(no_of_teams: int, no_of_matches: int, seed: int) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    no_of_leagues = max(no_of_teams // LEAGUE_SIZE, 1)
+    no_of_cups = max(no_of_leagues // LEAGUES_PER_CUP, 1)
+    league_sizes = np.bincount(np.arange(no_of_teams) % no_of_leagues)
+
+    # Team i plays in league i % no_of_leagues; cup matches pair any two teams
+    is_cup = rng.random(no_of_matches) < CUP_SHARE
+    league = rng.integers(no_of_leagues, size=no_of_matches)
+    size = league_sizes[league]
+    home_slot = rng.integers(size)
+    away_slot = (home_slot + 1 + rng.integers(size - 1)) % size
+    home_team = league + no_of_leagues * home_slot
+    away_team = league + no_of_leagues * away_slot
+    cup_home = rng.integers(no_of_teams, size=no_of_matches)
+    cup_away = (cup_home + 1 + rng.integers(no_of_teams - 1, size=no_of_matches)) % (
+        no_of_teams
+    )
+    home_team = np.where(is_cup, cup_home, home_team)
+    away_team = np.where(is_cup, cup_away, away_team)
+    league = np.where(
+        is_cup, no_of_leagues + rng.integers(no_of_cups, size=no_of_matches), league
+    )
+
+    in_team_rating = (rng.random(no_of_leagues) < 0.5)[
+        np.arange(no_of_teams) % no_of_leagues
+    ]
+    in_team_rating[0] = True
+    offence, defence = rng.normal(0, 0.3, (2, no_of_teams))
+    avg_goal = rng.normal(AVG_GOAL, 0.15, no_of_leagues + no_of_cups)
+    home_adv = rng.normal(HOME_ADV, 0.05, no_of_leagues + no_of_cups).clip(0)
+    home_avg = (
+        avg_goal[league]
+        + home_adv[league]
+        + offence[home_team]
+        + defence[away_team]
+        + rng.normal(0, NOISE, no_of_matches)
+    ).clip(0)
+    away_avg = (
+        avg_goal[league]
+        - home_adv[league]
+        + offence[away_team]
+        + defence[home_team]
+        + rng.normal(0, NOISE, no_of_matches)
+    ).clip(0)
+
+    # Same weights as solver.get_matches for a domestic club match within a year
+    age = rng.uniform(0, 365, no_of_matches)
+    recent = 1 - age / 365 + np.maximum((1 - age / 25) * 0.25, 0)
+
+    return [
+        {
+            "id": id,
+            "league_name": f"League {league}",
+            "home_id": str(home_team),
+            "home_team_in_rating": in_team_rating[home_team],
+            "away_id": str(away_team),
+            "away_team_in_rating": in_team_rating[away_team],
+            "recent": recent,
+            "home_avg": home_avg,
+            "away_avg": away_avg,
+        }
+        for id, league, home_team, away_team, recent, home_avg, away_avg in zip(
+            range(no_of_matches),
+            league.tolist(),
+            home_team.tolist(),
+            away_team.tolist(),
+            recent.tolist(),
+            home_avg.tolist(),
+            away_avg.tolist(),
+        )
+    ]
+
+
+def get_peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux; CBC runs as a child process
+    return round(
+        max(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+        )
+        / 1024,
+        1,
+    )
+
+
+@contextmanager
+def phase(name: str, timings: dict[str, float], peak_rss: dict[str, float]):
+    start = time.perf_counter()
+    yield
+    timings[name] = round(time.perf_counter() - start, 3)
+    peak_rss[name] = get_peak_rss_mb()
+
+
+def run_pulp(rows: list[dict], timings: dict, peak_rss: dict):
+    with phase("construction", timings, peak_rss):
+        problem = models.get_matches_and_teams(rows)
+    with phase("assembly", timings, peak_rss):
+        prob = solver.get_problem(problem["matches"], problem["teams"])
+    with phase("solve", timings, peak_rss):
+        prob.solve(PULP_CBC_CMD(msg=False))
+    with phase("extraction", timings, peak_rss):
+        solver.get_results(problem["teams"], problem["leagues"])
+
+
+def run_matrix(rows: list[dict], timings: dict, peak_rss: dict):
+    with phase("construction", timings, peak_rss):
+        problem = matrix.get_problem(rows)
+    with phase("assembly", timings, peak_rss):
+        model = matrix.get_model(matrix.get_linear_program(problem))
+    with phase("solve", timings, peak_rss):
+        highs = matrix.run(model)
+    if highs is None:
+        raise matrix.SolverError("Solver failed")
+    with phase("extraction", timings, peak_rss):
+        matrix.get_results(problem, np.array(highs.getSolution().col_value))
+
+
+def benchmark(backend: str, no_of_teams: int, no_of_matches: int, seed: int) -> dict:
+    timings, peak_rss = {}, {}
+    with phase("rows", timings, peak_rss):
+        rows = get_rows(no_of_teams, no_of_matches, seed)
+    {"matrix": run_matrix, "pulp": run_pulp}[backend](rows, timings, peak_rss)
+    return {
+        "wall_time": round(sum(timings.values()) - timings["rows"], 3),
+        "peak_rss_mb": max(peak_rss.values()),
+        "phases": timings,
+        "phase_peak_rss_mb": peak_rss,
+    }
+
+
+def run(backend: str, no_of_teams: int, no_of_matches: int, seed: int) -> dict:
+    # A fresh process per case so the peak RSS belongs to that case alone
+    with ProcessPoolExecutor(1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(
+            benchmark, backend, no_of_teams, no_of_matches, seed
+        ).result()
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict]):
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        speedup = baseline[name]["wall_time"] / result["wall_time"]
+        memory = result["peak_rss_mb"] / baseline[name]["peak_rss_mb"]
+        print(f"{name}: {speedup=:.2f}x {memory=:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", nargs="*", default=SCALES, help="TEAMS:MATCHES")
+    parser.add_argument("--backends", nargs="*", default=BACKENDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memory-limit-mb", type=float, default=MEMORY_LIMIT_MB)
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_S)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    args = parser.parse_args()
+
+    results = {}
+    for scale in args.scales:
+        no_of_teams, no_of_matches = map(int, scale.split(":"))
+        for backend in args.backends:
+            name = f"{backend} {no_of_teams}x{no_of_matches}"
+            results[name] = run(backend, no_of_teams, no_of_matches, args.seed)
+            print(name, json.dumps(results[name]))
+            if results[name]["peak_rss_mb"] > args.memory_limit_mb:
+                print(f"{name}: exceeds memory limit of {args.memory_limit_mb} MB")
+            if results[name]["wall_time"] > args.timeout:
+                print(f"{name}: exceeds timeout of {args.timeout} s")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=4))
+    if args.baseline:
+        compare(results, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from solver import irls, matrix
+
+
+def get_rows(args: argparse.Namespace) -> list[dict]:
+    if args.rows:
+        text = args.rows.read_text()
+        if text.lstrip().startswith("["):
+            return json.loads(text)
+        return [json.loads(line) for line in text.splitlines() if line]
+
+    from solver import queries
+
+    return queries.get_matches(args.type, args.max_time)
+
+
+def get_ratings(results: dict[str, list[dict[str, float]]]) -> np.ndarray:
+    return np.concatenate(
+        [
+            [league["avg_goal"] for league in results["leagues"]],
+            [league["home_adv"] for league in results["leagues"]],
+            [team["offence"] for team in results["teams"]],
+            [team["defence"] for team in results["teams"]],
+        ]
+    )
+
+
+def compare(problem: matrix.Problem, tolerance: float) -> dict[str, float]:
+    start = time.perf_counter()
+    lp_results, _ = matrix.solver(problem)
+    lp_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    irls_results = irls.solver(problem, tolerance)
+    irls_time = time.perf_counter() - start
+
+    design = matrix.get_design_matrix(problem)
+    scores = np.concatenate([problem.home_score, problem.away_score])
+    recent = np.concatenate([problem.recent, problem.recent])
+    lp_ratings, irls_ratings = get_ratings(lp_results), get_ratings(irls_results)
+    lp_objective = irls.get_objective(design, lp_ratings, scores, recent)
+    irls_objective = irls.get_objective(design, irls_ratings, scores, recent)
+    no_of_leagues = len(problem.leagues)
+    diff = np.abs(lp_ratings - irls_ratings)
+    return {
+        "matches": len(problem.id),
+        "teams": len(problem.teams),
+        "lp_time": round(lp_time, 3),
+        "irls_time": round(irls_time, 3),
+        "objective_gap": (irls_objective - lp_objective) / lp_objective,
+        "max_league_diff": float(diff[: 2 * no_of_leagues].max(initial=0)),
+        "max_team_diff": float(diff[2 * no_of_leagues :].max(initial=0)),
+        "mean_team_diff": float(diff[2 * no_of_leagues :].mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=Path)
+    parser.add_argument("--type", default="Club")
+    parser.add_argument("--max-time", type=int)
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    problem = matrix.get_problem(get_rows(args))
+    print(json.dumps(compare(problem, args.tolerance), indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import ssl
 import urllib3
 
 import requests
+from google.api_core.exceptions import NotFound
 from google.cloud import storage
 
 CLIENT = storage.Client()
@@ -23,6 +24,28 @@ def download_blob(blob_name: str, bucket_name: str) -> str:
     return CLIENT.bucket(bucket_name).blob(blob_name).download_as_text()
 
 
+def download_blob_as_bytes(blob_name: str, bucket_name: str) -> bytes | None:
+    try:
+        return CLIENT.bucket(bucket_name).blob(blob_name).download_as_bytes()
+    except NotFound:
+        return None
+
+
+def upload_bytes_to_bucket(data: bytes, blob_name: str, bucket_name: str):
+    blob = CLIENT.bucket(bucket_name).blob(blob_name)
+    try:
+        blob.upload_from_string(data, content_type="application/octet-stream")
+        logging.info(f"Uploaded blob: {blob_name=}")
+    except (
+        urllib3.exceptions.MaxRetryError,
+        requests.exceptions.ReadTimeout,
+        requests.exceptions.SSLError,
+        ssl.SSLEOFError,
+    ) as error:
+        logging.warning(f"Upload failed: {blob_name=} {error=}")
+        raise GCSUploadError()
+
+
 def upload_json_to_bucket(
     data: list[dict],
     blob_name: str,
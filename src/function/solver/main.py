@@ -1,4 +1,9 @@
+import logging
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from multiprocessing import get_context
 
 import functions_framework
 from cloudevents.http.event import CloudEvent
@@ -7,20 +12,129 @@ from cloudevents.http.event import CloudEvent
 from gcp import storage
 from gcp.logging import setup_logging
 from gcp.util import decode_message
-from solver import queries
+from solver import bootstrap, cache, irls, matrix, models, queries
 from solver.solver import solver
 
 setup_logging()
 
 
+def get_warm_start(_type: str) -> matrix.WarmStart | None:
+    data = storage.download_blob_as_bytes(
+        blob_name=f"warm_start/{_type}.npz",
+        bucket_name=os.environ["STATE_BUCKET_NAME"],
+    )
+    return matrix.WarmStart.loads(data) if data else None
+
+
+def get_pool(no_of_processes: int) -> ProcessPoolExecutor | None:
+    if no_of_processes > 1:
+        return ProcessPoolExecutor(no_of_processes, mp_context=get_context("spawn"))
+    return None
+
+
+def solve(
+    data: list[dict],
+    backend: str,
+    _type: str,
+    incremental: bool = False,
+    no_of_processes: int = 1,
+    no_of_replicates: int = 0,
+    tolerance: float = 1e-6,
+) -> dict[str, list[dict[str, float]]]:
+    start = time.perf_counter()
+    if backend == "matrix":
+        problem = matrix.get_problem(data)
+        built = time.perf_counter()
+        if no_of_replicates:
+            with get_pool(no_of_processes) or nullcontext() as pool:
+                results = bootstrap.bootstrap(
+                    problem, no_of_replicates, pool, no_of_processes
+                )
+        elif incremental:
+            results, warm_start = matrix.solver(problem, get_warm_start(_type))
+            storage.upload_bytes_to_bucket(
+                warm_start.dumps(),
+                blob_name=f"warm_start/{_type}.npz",
+                bucket_name=os.environ["STATE_BUCKET_NAME"],
+            )
+        else:
+            with get_pool(no_of_processes) or nullcontext() as pool:
+                results = matrix.solve_components(problem, pool)
+    elif backend == "irls":
+        problem = matrix.get_problem(data)
+        built = time.perf_counter()
+        results = irls.solver(problem, tolerance)
+    else:
+        problem = models.get_matches_and_teams(data)
+        built = time.perf_counter()
+        results = solver(problem["matches"], problem["teams"], problem["leagues"])
+    end = time.perf_counter()
+    logging.info(
+        f"Solved: {backend=} matches={len(data)} build={built - start:.2f} solve={end - built:.2f}"
+    )
+    return results
+
+
+def get_variant(
+    backend: str, incremental: bool, no_of_replicates: int, tolerance: float
+) -> str:
+    # Only settings the backend reads go into the key, so equal results share it
+    if backend == "matrix" and no_of_replicates:
+        return f"{backend}-bootstrap-{no_of_replicates}"
+    if backend == "matrix":
+        return f"{backend}-incremental-{incremental}"
+    if backend == "irls":
+        return f"{backend}-tolerance-{tolerance}"
+    return backend
+
+
 @functions_framework.cloud_event
 def main(cloud_event: CloudEvent):
     message = decode_message(cloud_event)
     _type, latest_match_date = message["_TYPE"], message["latest_match_date"]
 
-    data = queries.get_matches_and_teams(_type, latest_match_date)
+    backend = os.environ.get("BACKEND", "pulp")
+    incremental = os.environ.get("INCREMENTAL") == "true"
+    no_of_processes = int(os.environ.get("NO_OF_PROCESSES", 1))
+    no_of_replicates = int(os.environ.get("BOOTSTRAP_REPLICATES", 0))
+    tolerance = float(os.environ.get("TOLERANCE", 1e-6))
+    if incremental and (backend != "matrix" or no_of_replicates):
+        logging.warning(f"INCREMENTAL is ignored: {backend=} {no_of_replicates=}")
+    if no_of_replicates and backend != "matrix":
+        logging.warning(f"BOOTSTRAP_REPLICATES is ignored: {backend=}")
+    variant = get_variant(backend, incremental, no_of_replicates, tolerance)
+    _cache = cache.get_cache(
+        os.environ["STATE_BUCKET_NAME"] if os.environ.get("CACHE") == "true" else None,
+        os.environ.get("CACHE_DIR"),
+        float(os.environ.get("CACHE_TTL", 3600)),
+    )
+
+    input_hash = _cache.get_input_hash(_type, latest_match_date) if _cache else None
+    data = _cache.get_rows(input_hash) if input_hash else None
+    if data is None:
+        data = queries.get_matches(_type, latest_match_date)
+        if _cache:
+            input_hash = _cache.put_rows(_type, latest_match_date, data)
+    else:
+        logging.info(f"Cache hit: {input_hash=} matches={len(data)}")
+
+    results = _cache.get_results(input_hash, variant) if _cache else None
+    if results is None:
+        results = solve(
+            data,
+            backend,
+            _type,
+            incremental,
+            no_of_processes,
+            no_of_replicates,
+            tolerance,
+        )
+        if _cache:
+            _cache.put_results(input_hash, variant, results)
+    else:
+        logging.info(f"Cache hit: {input_hash=} {variant=}")
 
-    for name, data in solver(data["matches"], data["teams"], data["leagues"]).items():
+    for name, data in results.items():
         storage.upload_json_to_bucket(
             data,
             blob_name=f"{name}.json",
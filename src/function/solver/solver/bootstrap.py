@@ -0,0 +1,87 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import highspy
+import numpy as np
+
+from solver.matrix import (
+    LinearProgram,
+    Problem,
+    SolverError,
+    get_linear_program,
+    get_model,
+    solver,
+)
+
+
+def get_weights(
+    no_of_replicates: int, no_of_matches: int, seed: int | None = None
+) -> np.ndarray:
+    # Bayesian bootstrap: every match is kept with a positive random weight
+    rng = np.random.default_rng(seed)
+    return rng.exponential(size=(no_of_replicates, no_of_matches))
+
+
+def solve_replicates(lp: LinearProgram, weights: np.ndarray) -> np.ndarray:
+    # Only the objective changes between replicates, so one model is built per
+    # worker and re-solved after each cost update. The weights move the optimum
+    # too far for a simplex warm start to pay off, and only the primal values
+    # are needed, so crossover is skipped.
+    no_of_errors = len(lp.b_eq) - 2
+    no_of_ratings = len(lp.c) - 2 * no_of_errors
+    columns = np.arange(no_of_ratings, len(lp.c), dtype=np.int32)
+    cost = lp.c[no_of_ratings:]
+
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("solver", "ipm")
+    highs.setOptionValue("run_crossover", "off")
+    highs.passModel(get_model(lp))
+
+    ratings = np.empty((len(weights), no_of_ratings))
+    for i, _weights in enumerate(weights):
+        highs.changeColsCost(len(columns), columns, cost * np.tile(_weights, 4))
+        highs.run()
+        if highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+            raise SolverError("Bootstrap replicate failed")
+        ratings[i] = highs.getSolution().col_value[:no_of_ratings]
+    return ratings
+
+
+def bootstrap(
+    problem: Problem,
+    no_of_replicates: int,
+    pool: ProcessPoolExecutor | None = None,
+    no_of_chunks: int = 1,
+    seed: int | None = None,
+) -> dict[str, list[dict[str, float]]]:
+    if no_of_replicates < 2:
+        raise ValueError("Standard errors need at least 2 bootstrap replicates")
+    results, _ = solver(problem)
+    lp = get_linear_program(problem)
+    weights = get_weights(no_of_replicates, len(problem.id), seed)
+
+    start = time.perf_counter()
+    ratings = np.vstack(
+        list(
+            (pool.map if pool else map)(
+                partial(solve_replicates, lp),
+                np.array_split(weights, min(no_of_chunks, no_of_replicates)),
+            )
+        )
+    )
+    elapsed = time.perf_counter() - start
+    logging.info(f"Bootstrap: replicates={no_of_replicates} {elapsed=:.2f}")
+
+    no_of_leagues, no_of_teams = len(problem.leagues), len(problem.teams)
+    offence_se, defence_se = np.split(
+        ratings[:, 2 * no_of_leagues :].std(axis=0, ddof=1), [no_of_teams]
+    )
+    for team, _offence_se, _defence_se in zip(
+        results["teams"], offence_se.tolist(), defence_se.tolist()
+    ):
+        team["offence_se"] = _offence_se
+        team["defence_se"] = _defence_se
+    return results
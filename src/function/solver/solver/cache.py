@@ -0,0 +1,165 @@
+import hashlib
+import io
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from gcp import storage
+
+ROW_COLUMNS = {
+    "id": np.int64,
+    "league_name": np.str_,
+    "home_id": np.str_,
+    "home_team_in_rating": np.bool_,
+    "away_id": np.str_,
+    "away_team_in_rating": np.bool_,
+    "recent": np.float64,
+    "home_avg": np.float64,
+    "away_avg": np.float64,
+}
+RESULT_COLUMNS = {
+    "leagues": {"division": np.str_, "avg_goal": np.float64, "home_adv": np.float64},
+    "teams": {
+        "id": np.str_,
+        "offence": np.float64,
+        "defence": np.float64,
+        "offence_se": np.float64,
+        "defence_se": np.float64,
+    },
+}
+
+
+def dumps(arrays: dict[str, np.ndarray]) -> bytes:
+    f = io.BytesIO()
+    np.savez_compressed(f, **arrays)
+    return f.getvalue()
+
+
+def loads(data: bytes) -> dict[str, np.ndarray]:
+    with np.load(io.BytesIO(data), allow_pickle=False) as f:
+        return {name: f[name] for name in f.files}
+
+
+def get_row_columns(rows: list[dict]) -> dict[str, np.ndarray]:
+    return {
+        name: np.array([row[name] for row in rows], dtype=dtype)
+        for name, dtype in ROW_COLUMNS.items()
+    }
+
+
+def get_rows(columns: dict[str, np.ndarray]) -> list[dict]:
+    values = [columns[name].tolist() for name in ROW_COLUMNS]
+    return [dict(zip(ROW_COLUMNS, row)) for row in zip(*values)]
+
+
+def get_hash(columns: dict[str, np.ndarray]) -> str:
+    # Row order from BigQuery is not stable, so hash the rows sorted by match id
+    order = np.argsort(columns["id"], kind="stable")
+    digest = hashlib.sha256()
+    for name in ROW_COLUMNS:
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(columns[name][order]).tobytes())
+    return digest.hexdigest()
+
+
+def get_result_columns(
+    results: dict[str, list[dict[str, float]]],
+) -> dict[str, np.ndarray]:
+    return {
+        f"{name}.{column}": np.array(
+            [record[column] for record in results[name]], dtype=dtype
+        )
+        for name, columns in RESULT_COLUMNS.items()
+        for column, dtype in columns.items()
+        if all(column in record for record in results[name])
+    }
+
+
+def get_results(columns: dict[str, np.ndarray]) -> dict[str, list[dict[str, float]]]:
+    results = {}
+    for name, _columns in RESULT_COLUMNS.items():
+        _columns = [column for column in _columns if f"{name}.{column}" in columns]
+        values = [columns[f"{name}.{column}"].tolist() for column in _columns]
+        results[name] = [dict(zip(_columns, record)) for record in zip(*values)]
+    return results
+
+
+@dataclass
+class Cache:
+    bucket_name: str | None = None
+    directory: Path | None = None
+    ttl: float = 3600
+
+    def read(self, name: str) -> bytes | None:
+        if self.directory:
+            path = self.directory / name
+            return path.read_bytes() if path.exists() else None
+        return storage.download_blob_as_bytes(
+            blob_name=f"cache/{name}", bucket_name=self.bucket_name
+        )
+
+    def write(self, name: str, data: bytes):
+        if self.directory:
+            path = self.directory / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        else:
+            storage.upload_bytes_to_bucket(
+                data, blob_name=f"cache/{name}", bucket_name=self.bucket_name
+            )
+
+    def get_index(self, _type: str, max_time: int) -> dict | None:
+        data = self.read(f"index/{_type}/{max_time}.json")
+        return json.loads(data) if data else None
+
+    def get_input_hash(self, _type: str, max_time: int) -> str | None:
+        # Late results and corrections keep the same key, so an entry only
+        # stands in for BigQuery until it expires
+        index = self.get_index(_type, max_time)
+        if index is None or time.time() - index["created"] > self.ttl:
+            return None
+        return index["input_hash"]
+
+    def get_rows(self, input_hash: str) -> list[dict] | None:
+        data = self.read(f"inputs/{input_hash}.npz")
+        return get_rows(loads(data)) if data else None
+
+    def put_rows(self, _type: str, max_time: int, rows: list[dict]) -> str:
+        columns = get_row_columns(rows)
+        input_hash = get_hash(columns)
+        index = self.get_index(_type, max_time)
+        if index is None or index["input_hash"] != input_hash:
+            self.write(f"inputs/{input_hash}.npz", dumps(columns))
+        self.write(
+            f"index/{_type}/{max_time}.json",
+            json.dumps({"input_hash": input_hash, "created": time.time()}).encode(),
+        )
+        return input_hash
+
+    def get_results(
+        self, input_hash: str, backend: str
+    ) -> dict[str, list[dict[str, float]]] | None:
+        data = self.read(f"outputs/{input_hash}/{backend}.npz")
+        return get_results(loads(data)) if data else None
+
+    def put_results(
+        self, input_hash: str, backend: str, results: dict[str, list[dict[str, float]]]
+    ):
+        self.write(
+            f"outputs/{input_hash}/{backend}.npz", dumps(get_result_columns(results))
+        )
+
+
+def get_cache(
+    bucket_name: str | None = None, directory: str | None = None, ttl: float = 3600
+) -> Cache | None:
+    if directory:
+        return Cache(directory=Path(directory), ttl=ttl)
+    if bucket_name:
+        return Cache(bucket_name=bucket_name, ttl=ttl)
+    logging.info("Cache disabled")
+    return None
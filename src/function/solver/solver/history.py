@@ -0,0 +1,56 @@
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from solver.matrix import Problem, get_problem, get_subproblem
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+@dataclass
+class History:
+    problem: Problem
+    date_unix: np.ndarray
+    cut_off_year: np.ndarray
+
+
+def get_history(rows: list[dict]) -> History:
+    return History(
+        problem=get_problem([row | {"recent": 0.0} for row in rows]),
+        date_unix=np.array([row["date_unix"] for row in rows], dtype=np.int64),
+        cut_off_year=np.array([row["cut_off_year"] for row in rows], dtype=np.int64),
+    )
+
+
+def get_max_times(history: History, start_time: int, end_time: int) -> np.ndarray:
+    # The latest match at the end of each day, as solver.get_messages would report it.
+    # A day without a new match would repeat an earlier snapshot, so it gets none.
+    dates = np.sort(history.date_unix)
+    day_ends = np.arange(start_time, end_time, SECONDS_PER_DAY) + SECONDS_PER_DAY - 1
+    latest = np.searchsorted(dates, day_ends, side="right") - 1
+    max_times = np.unique(dates[latest[latest >= 0]])
+    return max_times[max_times >= start_time]
+
+
+def get_days_without_matches(
+    max_times: np.ndarray, start_time: int, end_time: int
+) -> np.ndarray:
+    day_starts = np.arange(start_time, end_time, SECONDS_PER_DAY)
+    days = (max_times - start_time) // SECONDS_PER_DAY
+    return np.delete(day_starts, days)
+
+
+def get_recent(history: History, max_time: int) -> tuple[np.ndarray, np.ndarray]:
+    # Mirrors the recentness CTE in solver.get_matches
+    age = max_time - history.date_unix
+    cut_off = 365 * SECONDS_PER_DAY * history.cut_off_year
+    matches = np.flatnonzero((age >= 0) & (age < cut_off))
+    age, cut_off_year = age[matches], history.cut_off_year[matches]
+    recent = 1 - age / (365 * SECONDS_PER_DAY * cut_off_year)
+    recent_bonus = (1 - age / (25 * SECONDS_PER_DAY * cut_off_year)) * 0.25
+    return matches, recent + np.maximum(recent_bonus, 0)
+
+
+def get_snapshot(history: History, max_time: int) -> Problem:
+    matches, recent = get_recent(history, max_time)
+    return replace(get_subproblem(history.problem, matches), recent=recent)
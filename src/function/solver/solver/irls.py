@@ -0,0 +1,78 @@
+import logging
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve
+
+from solver.matrix import (
+    Problem,
+    get_constraint_matrix,
+    get_design_matrix,
+    get_results,
+)
+
+MIN_RESIDUAL = 1e-6
+RIDGE = 1e-9
+
+
+def get_objective(
+    design: sparse.csr_array,
+    ratings: np.ndarray,
+    scores: np.ndarray,
+    recent: np.ndarray,
+) -> float:
+    return float(recent @ np.abs(design @ ratings - scores))
+
+
+def solve_weighted(
+    design: sparse.csr_array,
+    constraints: sparse.csr_array,
+    scores: np.ndarray,
+    weights: np.ndarray,
+    fixed: np.ndarray,
+) -> np.ndarray:
+    free = np.flatnonzero(~fixed)
+    design, constraints = design[:, free], constraints[:, free]
+    normal = design.T @ sparse.diags_array(weights) @ design
+    normal = normal + RIDGE * sparse.identity(len(free))
+    kkt = sparse.block_array(
+        [[normal, constraints.T], [constraints, None]], format="csc"
+    )
+    rhs = np.concatenate(
+        [design.T @ (weights * scores), np.zeros(constraints.shape[0])]
+    )
+    ratings = np.zeros(len(fixed))
+    ratings[free] = spsolve(kkt, rhs)[: len(free)]
+    return ratings
+
+
+def solver(
+    problem: Problem, tolerance: float = 1e-6, max_iter: int = 200
+) -> dict[str, list[dict[str, float]]]:
+    design = get_design_matrix(problem)
+    constraints = get_constraint_matrix(problem)
+    constraints = constraints[np.diff(constraints.indptr) > 0]
+    scores = np.concatenate([problem.home_score, problem.away_score])
+    recent = np.concatenate([problem.recent, problem.recent])
+    no_of_bounded = 2 * len(problem.leagues)
+
+    fixed = np.zeros(design.shape[1], dtype=bool)
+    ratings = solve_weighted(design, constraints, scores, recent, fixed)
+    objective = get_objective(design, ratings, scores, recent)
+    for i in range(max_iter):
+        residuals = np.abs(design @ ratings - scores)
+        weights = recent / np.maximum(residuals, MIN_RESIDUAL)
+        ratings = solve_weighted(design, constraints, scores, weights, fixed)
+
+        negative = ratings[:no_of_bounded] < 0
+        if negative.any():
+            fixed[:no_of_bounded] |= negative
+            ratings = solve_weighted(design, constraints, scores, weights, fixed)
+
+        previous_objective = objective
+        objective = get_objective(design, ratings, scores, recent)
+        if abs(previous_objective - objective) <= tolerance * previous_objective:
+            break
+
+    logging.info(f"IRLS: iterations={i + 1} {objective=:.4f}")
+    return get_results(problem, ratings)
@@ -0,0 +1,429 @@
+import io
+import logging
+import time
+from dataclasses import dataclass
+
+from concurrent.futures import ProcessPoolExecutor
+
+import highspy
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+BASIC = int(highspy.HighsBasisStatus.kBasic)
+LOWER = int(highspy.HighsBasisStatus.kLower)
+ZERO = int(highspy.HighsBasisStatus.kZero)
+MIN_OVERLAP = 0.5
+
+
+class SolverError(Exception):
+    pass
+
+
+@dataclass
+class Problem:
+    leagues: list[str]
+    teams: list[str]
+    in_solver_constraints: np.ndarray
+    league: np.ndarray
+    home_team: np.ndarray
+    away_team: np.ndarray
+    home_score: np.ndarray
+    away_score: np.ndarray
+    recent: np.ndarray
+    id: np.ndarray
+
+
+@dataclass
+class WarmStart:
+    leagues: list[str]
+    teams: list[str]
+    id: np.ndarray
+    col_status: np.ndarray
+    row_status: np.ndarray
+    cold_time: float
+
+    def dumps(self) -> bytes:
+        f = io.BytesIO()
+        np.savez_compressed(
+            f,
+            leagues=np.array(self.leagues),
+            teams=np.array(self.teams),
+            id=self.id,
+            col_status=self.col_status,
+            row_status=self.row_status,
+            cold_time=self.cold_time,
+        )
+        return f.getvalue()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "WarmStart":
+        with np.load(io.BytesIO(data), allow_pickle=False) as f:
+            return cls(
+                leagues=f["leagues"].tolist(),
+                teams=f["teams"].tolist(),
+                id=f["id"],
+                col_status=f["col_status"],
+                row_status=f["row_status"],
+                cold_time=float(f["cold_time"]),
+            )
+
+
+@dataclass
+class LinearProgram:
+    c: np.ndarray
+    A_eq: sparse.csr_array
+    b_eq: np.ndarray
+    bounds: np.ndarray
+
+
+def get_problem(rows: list[dict]) -> Problem:
+    leagues, teams, in_solver_constraints = {}, {}, {}
+    for row in rows:
+        leagues.setdefault(row["league_name"], len(leagues))
+        for side in ("home", "away"):
+            teams.setdefault(row[f"{side}_id"], len(teams))
+            in_solver_constraints[row[f"{side}_id"]] = row[f"{side}_team_in_rating"]
+
+    return Problem(
+        leagues=list(leagues),
+        teams=list(teams),
+        in_solver_constraints=np.array(
+            [in_solver_constraints[team] for team in teams], dtype=bool
+        ),
+        league=np.array([leagues[row["league_name"]] for row in rows], dtype=int),
+        home_team=np.array([teams[row["home_id"]] for row in rows], dtype=int),
+        away_team=np.array([teams[row["away_id"]] for row in rows], dtype=int),
+        home_score=np.array([row["home_avg"] for row in rows], dtype=float),
+        away_score=np.array([row["away_avg"] for row in rows], dtype=float),
+        recent=np.array([row["recent"] for row in rows], dtype=float),
+        id=np.array([row["id"] for row in rows], dtype=int),
+    )
+
+
+def get_design_matrix(problem: Problem) -> sparse.csr_array:
+    no_of_leagues, no_of_teams = len(problem.leagues), len(problem.teams)
+    no_of_matches = len(problem.league)
+    avg_goal = problem.league
+    home_adv = no_of_leagues + problem.league
+    home_offence = 2 * no_of_leagues + problem.home_team
+    away_offence = 2 * no_of_leagues + problem.away_team
+    home_defence = 2 * no_of_leagues + no_of_teams + problem.home_team
+    away_defence = 2 * no_of_leagues + no_of_teams + problem.away_team
+
+    ones = np.ones(no_of_matches)
+    return sparse.csr_array(
+        (
+            np.concatenate([ones, ones, ones, -ones, ones, ones, ones, ones]),
+            (
+                np.tile(np.arange(2 * no_of_matches), 4),
+                np.concatenate(
+                    [
+                        avg_goal,
+                        avg_goal,
+                        home_adv,
+                        home_adv,
+                        home_offence,
+                        away_offence,
+                        away_defence,
+                        home_defence,
+                    ]
+                ),
+            ),
+        ),
+        shape=(2 * no_of_matches, 2 * no_of_leagues + 2 * no_of_teams),
+    )
+
+
+def get_constraint_matrix(problem: Problem) -> sparse.csr_array:
+    no_of_leagues, no_of_teams = len(problem.leagues), len(problem.teams)
+    constrained = np.flatnonzero(problem.in_solver_constraints)
+    return sparse.csr_array(
+        (
+            np.ones(2 * len(constrained)),
+            (
+                np.repeat([0, 1], len(constrained)),
+                np.concatenate(
+                    [
+                        2 * no_of_leagues + constrained,
+                        2 * no_of_leagues + no_of_teams + constrained,
+                    ]
+                ),
+            ),
+        ),
+        shape=(2, 2 * no_of_leagues + 2 * no_of_teams),
+    )
+
+
+def get_linear_program(problem: Problem) -> LinearProgram:
+    # Weighted absolute errors split into positive and negative parts:
+    # design @ ratings - errors_pos + errors_neg == scores
+    design = get_design_matrix(problem)
+    no_of_ratings, no_of_errors = design.shape[1], design.shape[0]
+    errors = sparse.identity(no_of_errors, format="csr")
+    recent = np.concatenate([problem.recent, problem.recent])
+
+    bounds = np.zeros((no_of_ratings + 2 * no_of_errors, 2))
+    bounds[:, 1] = np.inf
+    bounds[2 * len(problem.leagues) : no_of_ratings, 0] = -np.inf
+    return LinearProgram(
+        c=np.concatenate([np.zeros(no_of_ratings), recent, recent]),
+        A_eq=sparse.vstack(
+            [
+                sparse.hstack([design, -errors, errors]),
+                sparse.hstack(
+                    [
+                        get_constraint_matrix(problem),
+                        sparse.csr_array((2, 2 * no_of_errors)),
+                    ]
+                ),
+            ],
+            format="csr",
+        ),
+        b_eq=np.concatenate([problem.home_score, problem.away_score, [0, 0]]),
+        bounds=bounds,
+    )
+
+
+def get_results(problem: Problem, x: np.ndarray) -> dict[str, list[dict[str, float]]]:
+    no_of_leagues, no_of_teams = len(problem.leagues), len(problem.teams)
+    avg_goal, home_adv, offence, defence = np.split(
+        x[: 2 * no_of_leagues + 2 * no_of_teams],
+        np.cumsum([no_of_leagues, no_of_leagues, no_of_teams]),
+    )
+    return {
+        "leagues": [
+            {"division": name, "avg_goal": avg_goal, "home_adv": home_adv}
+            for name, avg_goal, home_adv in zip(
+                problem.leagues, avg_goal.tolist(), home_adv.tolist()
+            )
+        ],
+        "teams": [
+            {"id": id, "offence": offence, "defence": defence}
+            for id, offence, defence in zip(
+                problem.teams, offence.tolist(), defence.tolist()
+            )
+        ],
+    }
+
+
+def get_model(lp: LinearProgram) -> highspy.HighsLp:
+    A_eq = sparse.csc_array(lp.A_eq)
+    model = highspy.HighsLp()
+    model.num_row_, model.num_col_ = A_eq.shape
+    model.col_cost_ = lp.c
+    model.col_lower_ = lp.bounds[:, 0]
+    model.col_upper_ = lp.bounds[:, 1]
+    model.row_lower_ = lp.b_eq
+    model.row_upper_ = lp.b_eq
+    model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+    model.a_matrix_.start_ = A_eq.indptr
+    model.a_matrix_.index_ = A_eq.indices
+    model.a_matrix_.value_ = A_eq.data
+    return model
+
+
+def get_index(keys: list, previous_keys: list) -> np.ndarray:
+    previous_index = {key: i for i, key in enumerate(previous_keys)}
+    return np.array([previous_index.get(key, -1) for key in keys], dtype=int)
+
+
+def map_status(
+    status: np.ndarray, index: np.ndarray, default: int | np.ndarray
+) -> np.ndarray:
+    return np.where(index >= 0, status[index.clip(0)], default)
+
+
+def get_basis(problem: Problem, warm_start: WarmStart) -> highspy.HighsBasis:
+    no_of_leagues, no_of_teams = len(problem.leagues), len(problem.teams)
+    no_of_matches = len(problem.id)
+    previous_no_of_leagues = len(warm_start.leagues)
+    previous_no_of_teams = len(warm_start.teams)
+    previous_no_of_matches = len(warm_start.id)
+
+    leagues = get_index(problem.leagues, warm_start.leagues)
+    teams = get_index(problem.teams, warm_start.teams)
+    matches = get_index(problem.id.tolist(), warm_start.id.tolist())
+
+    ratings = np.concatenate(
+        [
+            leagues,
+            np.where(leagues >= 0, previous_no_of_leagues + leagues, -1),
+            np.where(teams >= 0, 2 * previous_no_of_leagues + teams, -1),
+            np.where(
+                teams >= 0,
+                2 * previous_no_of_leagues + previous_no_of_teams + teams,
+                -1,
+            ),
+        ]
+    )
+    errors = np.concatenate(
+        [
+            np.where(matches >= 0, offset + matches, -1)
+            for offset in np.arange(4) * previous_no_of_matches
+        ]
+    )
+    previous_no_of_ratings = 2 * previous_no_of_leagues + 2 * previous_no_of_teams
+    col_status = np.concatenate(
+        [
+            map_status(warm_start.col_status, ratings, ZERO),
+            map_status(
+                warm_start.col_status,
+                np.where(errors >= 0, previous_no_of_ratings + errors, -1),
+                LOWER,
+            ),
+        ]
+    )
+    col_status[: 2 * no_of_leagues] = np.where(
+        col_status[: 2 * no_of_leagues] == ZERO, LOWER, col_status[: 2 * no_of_leagues]
+    )
+    rows = np.concatenate(
+        [
+            np.where(matches >= 0, matches, -1),
+            np.where(matches >= 0, previous_no_of_matches + matches, -1),
+            2 * previous_no_of_matches + np.arange(2),
+        ]
+    )
+    row_status = map_status(warm_start.row_status, rows, BASIC)
+
+    # Keep exactly one basic variable per row, preferring rows of new matches
+    excess = (col_status == BASIC).sum() + (row_status == BASIC).sum()
+    excess -= len(row_status)
+    order = np.argsort(rows >= 0, kind="stable")
+    if excess > 0:
+        basic = order[row_status[order] == BASIC][:excess]
+        row_status[basic] = LOWER
+    elif excess < 0:
+        nonbasic = order[row_status[order] != BASIC][:-excess]
+        row_status[nonbasic] = BASIC
+
+    basis = highspy.HighsBasis()
+    basis.col_status = [highspy.HighsBasisStatus(s) for s in col_status.tolist()]
+    basis.row_status = [highspy.HighsBasisStatus(s) for s in row_status.tolist()]
+    basis.valid = True
+    return basis
+
+
+def run(
+    model: highspy.HighsLp, basis: highspy.HighsBasis | None = None
+) -> highspy.Highs | None:
+    highs = highspy.Highs()
+    highs.setOptionValue("output_flag", False)
+    highs.setOptionValue("solver", "ipm" if basis is None else "simplex")
+    highs.passModel(model)
+    if basis is not None and highs.setBasis(basis) != highspy.HighsStatus.kOk:
+        return None
+    highs.run()
+    if highs.getModelStatus() != highspy.HighsModelStatus.kOptimal:
+        return None
+    return highs
+
+
+def solver(
+    problem: Problem, warm_start: WarmStart | None = None
+) -> tuple[dict[str, list[dict[str, float]]], WarmStart]:
+    model = get_model(get_linear_program(problem))
+
+    if warm_start and np.isin(problem.id, warm_start.id).mean() < MIN_OVERLAP:
+        logging.info("Warm start skipped: too few matches in common")
+        warm_start = None
+
+    highs = None
+    if warm_start:
+        start = time.perf_counter()
+        highs = run(model, get_basis(problem, warm_start))
+        elapsed = time.perf_counter() - start
+        if highs is None:
+            logging.warning(f"Warm start failed: {elapsed=:.2f}")
+        else:
+            cold_time = warm_start.cold_time
+            logging.info(
+                f"Warm start: {elapsed=:.2f} {cold_time=:.2f} saved={cold_time - elapsed:.2f}"
+            )
+
+    if highs is None:
+        start = time.perf_counter()
+        highs = run(model)
+        cold_time = time.perf_counter() - start
+        if highs is None:
+            raise SolverError("Solver failed")
+
+    basis = highs.getBasis()
+    return get_results(problem, np.array(highs.getSolution().col_value)), WarmStart(
+        leagues=problem.leagues,
+        teams=problem.teams,
+        id=problem.id,
+        col_status=np.array([int(s) for s in basis.col_status], dtype=np.int8),
+        row_status=np.array([int(s) for s in basis.row_status], dtype=np.int8),
+        cold_time=cold_time,
+    )
+
+
+def get_components(problem: Problem) -> list[np.ndarray]:
+    no_of_teams = len(problem.teams)
+    no_of_nodes = no_of_teams + len(problem.leagues)
+    graph = sparse.coo_array(
+        (
+            np.ones(2 * len(problem.id)),
+            (
+                np.concatenate([problem.home_team, problem.home_team]),
+                np.concatenate([problem.away_team, no_of_teams + problem.league]),
+            ),
+        ),
+        shape=(no_of_nodes, no_of_nodes),
+    )
+    _, labels = connected_components(graph, directed=False)
+    labels = labels[problem.home_team]
+    order = np.argsort(labels, kind="stable")
+    components = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+    return sorted(components, key=len, reverse=True)
+
+
+def get_subproblem(problem: Problem, matches: np.ndarray) -> Problem:
+    leagues, league = np.unique(problem.league[matches], return_inverse=True)
+    teams, team = np.unique(
+        np.concatenate([problem.home_team[matches], problem.away_team[matches]]),
+        return_inverse=True,
+    )
+    home_team, away_team = np.split(team, 2)
+    return Problem(
+        leagues=[problem.leagues[i] for i in leagues],
+        teams=[problem.teams[i] for i in teams],
+        in_solver_constraints=problem.in_solver_constraints[teams],
+        league=league,
+        home_team=home_team,
+        away_team=away_team,
+        home_score=problem.home_score[matches],
+        away_score=problem.away_score[matches],
+        recent=problem.recent[matches],
+        id=problem.id[matches],
+    )
+
+
+def solve_component(
+    problem: Problem,
+) -> tuple[dict[str, list[dict[str, float]]], float]:
+    start = time.perf_counter()
+    results, _ = solver(problem)
+    return results, time.perf_counter() - start
+
+
+def solve_components(
+    problem: Problem, pool: ProcessPoolExecutor | None = None
+) -> dict[str, list[dict[str, float]]]:
+    subproblems = [
+        get_subproblem(problem, matches) for matches in get_components(problem)
+    ]
+    logging.info(f"Components: sizes={[len(p.teams) for p in subproblems]}")
+
+    results = {"leagues": [], "teams": []}
+    for i, (subproblem, (_results, elapsed)) in enumerate(
+        zip(subproblems, (pool.map if pool else map)(solve_component, subproblems))
+    ):
+        logging.info(
+            f"Solved component: {i=} matches={len(subproblem.id)} "
+            f"teams={len(subproblem.teams)} {elapsed=:.2f}"
+        )
+        results["leagues"] += _results["leagues"]
+        results["teams"] += _results["teams"]
+    return results
@@ -3,9 +3,7 @@ from pulp import LpMinimize, LpProblem, lpSum
 from solver.models import League, Match, Team
 
 
-def solver(
-    matches: list[Match], teams: list[Team], leagues: list[League]
-) -> dict[str, list[dict[str, float]]]:
+def get_problem(matches: list[Match], teams: list[Team]) -> LpProblem:
     prob = LpProblem(sense=LpMinimize)
 
     for match in matches:
@@ -24,8 +22,12 @@ def solver(
     prob += lpSum(team.offence for team in teams if team.in_solver_constraints) == 0
     prob += lpSum(team.defence for team in teams if team.in_solver_constraints) == 0
 
-    prob.solve()
+    return prob
 
+
+def get_results(
+    teams: list[Team], leagues: list[League]
+) -> dict[str, list[dict[str, float]]]:
     return {
         "leagues": [
             {
@@ -44,3 +46,10 @@ def solver(
             for team in teams
         ],
     }
+
+
+def solver(
+    matches: list[Match], teams: list[Team], leagues: list[League]
+) -> dict[str, list[dict[str, float]]]:
+    get_problem(matches, teams).solve()
+    return get_results(teams, leagues)
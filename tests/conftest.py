@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+FUNCTIONS = Path(__file__).parents[1] / "src/function"
+
+for function in ("footystats_transform_matches", "simulate_tournament"):
+    sys.path.insert(0, str(FUNCTIONS / function))
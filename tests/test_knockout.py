@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+
+from simulation.models import Match, Team
+from simulation.models.state import State
+from simulation.tournaments import Knockout, VectorizedKnockout
+
+AVG_GOAL = 1.35
+HOME_ADV = 0.15
+NO_OF_SIMULATIONS = 4000
+
+
+def get_teams() -> dict[str, Team]:
+    return {
+        name: Team(name, 0.3 - 0.06 * i, -0.2 + 0.04 * i)
+        for i, name in enumerate("ABCDEFGHIJ")
+    }
+
+
+def get_matches(teams: dict[str, Team]) -> list[Match]:
+    return [
+        # A leads the first leg away, the second leg is still to play
+        Match(teams["B"], teams["A"], "complete", 0, 1),
+        Match(teams["A"], teams["B"]),
+        # C has already won on aggregate
+        Match(teams["D"], teams["C"], "complete", 1, 0),
+        Match(teams["C"], teams["D"], "complete", 2, 0),
+        # G is already known to be through
+        Match(teams["H"], teams["G"]),
+        Match(teams["G"], teams["H"]),
+    ]
+
+
+def simulate_scalar(seed: int = 0) -> np.ndarray:
+    random.seed(seed)
+    np.random.seed(seed)
+    teams = get_teams()
+    matches = get_matches(teams)
+    winning_teams = {teams["G"]}
+    names = list(teams)
+    advanced = np.zeros(len(teams), dtype=int)
+    for _ in range(NO_OF_SIMULATIONS):
+        series = Knockout.draw_series(set(teams.values()), matches, leg=2)
+        for leg1, leg2 in series.values():
+            if not leg1.is_complete:
+                leg1.simulate(AVG_GOAL, HOME_ADV)
+            agg = leg1 + leg2
+            if not agg.is_complete:
+                agg.simulate(AVG_GOAL, HOME_ADV, is_cup=True)
+            known = winning_teams & set(agg.teams)
+            winner = known.pop() if known else agg.winning_team
+            advanced[names.index(winner.name)] += 1
+        for match in matches:
+            match.reset()
+    return advanced
+
+
+def simulate_vectorized(seed: int = 1) -> np.ndarray:
+    random.seed(seed)
+    np.random.seed(seed)
+    teams = get_teams()
+    state = State(list(teams.values()))
+    knockout = VectorizedKnockout(
+        "Quarter-finals",
+        AVG_GOAL,
+        HOME_ADV,
+        get_matches(teams),
+        winning_teams={teams["G"]},
+        state=state,
+    )
+    knockout.add_teams_batch(np.tile(np.arange(len(teams)), (NO_OF_SIMULATIONS, 1)))
+    knockout.simulate_batch(NO_OF_SIMULATIONS)
+    advanced = knockout.get_advanced_batch()
+    assert ((advanced >= 0).sum(axis=1) == len(teams) // 2).all()
+    return np.bincount(advanced[advanced >= 0], minlength=len(teams))
+
+
+def test_vectorized_knockout_matches_scalar():
+    expected = simulate_scalar() / NO_OF_SIMULATIONS
+    actual = simulate_vectorized() / NO_OF_SIMULATIONS
+
+    np.testing.assert_array_equal(expected[[2, 3, 6, 7]], [1, 0, 1, 0])
+    np.testing.assert_array_equal(actual[[2, 3, 6, 7]], [1, 0, 1, 0])
+    standard_error = np.sqrt(2 * expected * (1 - expected) / NO_OF_SIMULATIONS)
+    np.testing.assert_array_less(np.abs(actual - expected), 4.5 * standard_error + 1e-3)
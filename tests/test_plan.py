@@ -0,0 +1,61 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from simulation.plan import InvalidRoundsError, compile_plan
+
+ASSETS = Path(__file__).parents[1] / "assets/simulation"
+
+
+@pytest.mark.parametrize("path", sorted(ASSETS.glob("*.json")), ids=lambda p: p.stem)
+def test_compile_plan_assets(path: Path):
+    rounds = json.loads(path.read_text())
+    plan = compile_plan(rounds)
+    order = [step.name for step in plan]
+    assert sorted(order) == sorted(rounds)
+    for i, step in enumerate(plan):
+        assert all(advance.target > i for advance in step.advance)
+
+
+@pytest.mark.parametrize(
+    "rounds",
+    [
+        {"A": {"format": "Knockout", "leg": 1}},
+        {"A": {"format": "Knockout", "leg": 1, "advance_to": "B"}},
+        {
+            "A": {"format": "Knockout", "leg": 1, "advance_to": "B"},
+            "B": {"format": "Knockout", "leg": 1, "advance_to": "A"},
+        },
+        {"A": {"format": "Playoff"}},
+        {"A": {"format": "Knockout", "advance_to": "B"}, "B": {"format": "Winner"}},
+        {
+            "A": {"format": "Knockout", "leg": 3, "advance_to": "B"},
+            "B": {"format": "Winner"},
+        },
+        {
+            "A": {"format": "Season", "advance_to": {"B": {"start": 1, "end": 2}}},
+            "B": {"format": "Season"},
+        },
+        {
+            "A": {"format": "Season", "advance_to": {"B": {"start": 3, "end": 2}}},
+            "B": {"format": "Knockout", "leg": 1, "advance_to": "C"},
+            "C": {"format": "Winner"},
+        },
+        {"A": {"format": "Season", "advance_to": "B"}, "B": {"format": "Winner"}},
+    ],
+    ids=[
+        "missing-advance-to",
+        "dangling",
+        "cycle",
+        "format",
+        "missing-leg",
+        "leg",
+        "advance-to-season",
+        "positions",
+        "advance-to-type",
+    ],
+)
+def test_compile_plan_rejects(rounds: dict[str, dict]):
+    with pytest.raises(InvalidRoundsError):
+        compile_plan(rounds)
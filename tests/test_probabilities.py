@@ -0,0 +1,76 @@
+import random
+from math import exp, factorial
+
+import numpy as np
+import pytest
+
+from simulation.models import Match, Team
+from simulation.probabilities import MAX_GOALS, advance_probabilities
+from simulation.tournaments import Knockout
+
+AVG_GOAL = 1.35
+HOME_ADV = 0.15
+NO_OF_SIMULATIONS = 20000
+
+
+def poisson(k: int, mean: float) -> float:
+    return mean**k * exp(-mean) / factorial(k)
+
+
+def diff_probabilities(home_exp: float, away_exp: float) -> dict[int, float]:
+    probabilities = {}
+    for home in range(MAX_GOALS + 1):
+        for away in range(MAX_GOALS + 1):
+            probability = poisson(home, home_exp) * poisson(away, away_exp)
+            probabilities[home - away] = probabilities.get(home - away, 0) + probability
+    return probabilities
+
+
+def closed_form(lead: int, regulation_exp: tuple, extra_time_exp: tuple) -> float:
+    regulation = diff_probabilities(*regulation_exp)
+    extra_time = diff_probabilities(*extra_time_exp)
+    win = sum(p for diff, p in regulation.items() if lead + diff > 0)
+    draw = regulation.get(-lead, 0)
+    extra_time_win = sum(p for diff, p in extra_time.items() if diff > 0)
+    return win + draw * (extra_time_win + extra_time[0] / 2)
+
+
+@pytest.mark.parametrize(
+    "lead, regulation_exp, expected",
+    [(1, (1.6, 1.0), 0.850), (-1, (2.0, 0.8), 0.564), (0, (1.2, 1.2), 0.5)],
+)
+def test_advance_probabilities_one_leg(lead, regulation_exp, expected):
+    extra_time_exp = tuple(goals / 3 for goals in regulation_exp)
+    probability = advance_probabilities(
+        np.array([lead]),
+        np.array([(0, 0)]),
+        np.array([regulation_exp]),
+        np.array([extra_time_exp]),
+    )[0]
+    assert probability == pytest.approx(
+        closed_form(lead, regulation_exp, extra_time_exp)
+    )
+    assert probability == pytest.approx(expected, abs=5e-4)
+
+
+@pytest.mark.parametrize("home_score, away_score", [(0, 0), (2, 1), (0, 1)])
+def test_knockout_probabilities_match_simulation(home_score: int, away_score: int):
+    random.seed(0)
+    np.random.seed(0)
+    home_team, away_team = Team("A", 0.3, -0.1), Team("B", -0.2, 0.1)
+    first_leg = Match(away_team, home_team, "complete", away_score, home_score)
+    second_leg = Match(home_team, away_team)
+    knockout = Knockout("Final", AVG_GOAL, HOME_ADV, [first_leg, second_leg])
+    agg, tie = knockout.get_tie([first_leg, second_leg])
+    probability = knockout.get_probabilities([tie])[0]
+
+    wins = 0
+    for _ in range(NO_OF_SIMULATIONS):
+        agg.simulate(AVG_GOAL, HOME_ADV, is_cup=True)
+        wins += agg.winning_team == home_team
+        agg.reset()
+
+    standard_error = np.sqrt(probability * (1 - probability) / NO_OF_SIMULATIONS)
+    assert wins / NO_OF_SIMULATIONS == pytest.approx(
+        probability, abs=4 * standard_error
+    )
@@ -0,0 +1,132 @@
+import random
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from simulation.models import Match, Team
+from simulation.models.state import State
+from simulation.tournaments import Season, VectorizedSeason
+
+AVG_GOAL = 1.35
+HOME_ADV = 0.15
+NO_OF_SIMULATIONS = 4000
+RATINGS = [(0.4, -0.3), (0.2, -0.1), (0.0, 0.0), (-0.1, 0.1), (-0.2, 0.2), (-0.3, 0.3)]
+
+
+def get_teams() -> list[Team]:
+    return [
+        Team(str(i), offence, defence) for i, (offence, defence) in enumerate(RATINGS)
+    ]
+
+
+def get_matches(teams: list[Team], played: float) -> list[Match]:
+    rng = random.Random(0)
+    return [
+        (
+            Match(
+                home_team, away_team, "complete", rng.randint(0, 2), rng.randint(0, 2)
+            )
+            if rng.random() < played
+            else Match(home_team, away_team)
+        )
+        for home_team, away_team in permutations(teams, 2)
+    ]
+
+
+def simulate_scalar(
+    played: float, h2h: bool, no_of_simulations: int, seed: int = 0
+) -> tuple[State, list[Team]]:
+    np.random.seed(seed)
+    teams = get_teams()
+    state = State(teams)
+    season = Season(teams, AVG_GOAL, HOME_ADV, get_matches(teams, played), h2h)
+    for _ in range(no_of_simulations):
+        season.simulate()
+        positions = season.positions
+        season.reset()
+    return state, positions
+
+
+def simulate_vectorized(
+    played: float, h2h: bool, no_of_simulations: int, seed: int = 0
+) -> tuple[State, list[Team]]:
+    np.random.seed(seed)
+    teams = get_teams()
+    state = State(teams)
+    season = VectorizedSeason(
+        teams, AVG_GOAL, HOME_ADV, get_matches(teams, played), h2h, state=state
+    )
+    season.simulate_batch(no_of_simulations)
+    positions = [teams[i] for i in season.get_advanced_batch(len(teams))[-1]]
+    return state, positions
+
+
+@pytest.mark.parametrize("h2h", [False, True])
+def test_vectorized_season_matches_scalar(h2h: bool):
+    scalar, _ = simulate_scalar(0.5, h2h, NO_OF_SIMULATIONS)
+    vectorized, _ = simulate_vectorized(0.5, h2h, NO_OF_SIMULATIONS, seed=1)
+
+    expected = scalar.positions / NO_OF_SIMULATIONS
+    actual = vectorized.positions / NO_OF_SIMULATIONS
+    standard_error = np.sqrt(2 * expected * (1 - expected) / NO_OF_SIMULATIONS)
+    np.testing.assert_array_less(np.abs(actual - expected), 4.5 * standard_error + 1e-3)
+
+    expected = scalar.table / NO_OF_SIMULATIONS
+    actual = vectorized.table / NO_OF_SIMULATIONS
+    np.testing.assert_allclose(actual, expected, rtol=0.05, atol=0.1)
+
+
+@pytest.mark.parametrize("h2h", [False, True])
+def test_fully_played_season_matches_scalar(h2h: bool):
+    scalar, scalar_positions = simulate_scalar(1, h2h, 3)
+    vectorized, vectorized_positions = simulate_vectorized(1, h2h, 3)
+
+    np.testing.assert_array_equal(vectorized.table, scalar.table)
+    np.testing.assert_array_equal(vectorized.positions, scalar.positions)
+    assert vectorized_positions == scalar_positions
+    assert np.count_nonzero(scalar.positions) == len(RATINGS)
+
+    expected = np.zeros_like(scalar.table)
+    for match in get_matches(get_teams(), 1):
+        home, away = int(match.home_team.name), int(match.away_team.name)
+        result = np.sign(match.home_score - match.away_score)
+        expected[home, 1 - result] += 1
+        expected[away, 1 + result] += 1
+        expected[home, 3:5] += match.home_score, match.away_score
+        expected[away, 3:5] += match.away_score, match.home_score
+    np.testing.assert_array_equal(scalar.table, expected * 3)
+
+
+# A and B finish level on points: A won their meeting, B has the better goal
+# difference, and counting their other results would put B ahead on h2h
+H2H_RESULTS = [
+    ("A", "B", 1, 0),
+    ("C", "A", 3, 0),
+    ("A", "D", 1, 0),
+    ("B", "C", 5, 0),
+    ("B", "D", 1, 0),
+    ("C", "D", 0, 0),
+]
+
+
+@pytest.mark.parametrize("h2h, expected", [(True, "ABCD"), (False, "BACD")])
+@pytest.mark.parametrize("vectorized", [False, True])
+def test_h2h_positions(h2h: bool, expected: str, vectorized: bool):
+    teams = {name: Team(name, 0, 0) for name in "ABCD"}
+    matches = [
+        Match(teams[home], teams[away], "complete", home_score, away_score)
+        for home, away, home_score, away_score in H2H_RESULTS
+    ]
+    state = State(list(teams.values()))
+    if vectorized:
+        season = VectorizedSeason(
+            teams.values(), AVG_GOAL, HOME_ADV, matches, h2h, 1, state
+        )
+        season.simulate_batch(1)
+        positions = [state.teams[i] for i in season.get_advanced_batch(4)[0]]
+    else:
+        season = Season(list(teams.values()), AVG_GOAL, HOME_ADV, matches, h2h, 1)
+        season.simulate()
+        positions = season.positions
+    assert "".join(team.name for team in positions) == expected
@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from transform import get_columns, transform_matches, transform_matches_batch
+
+FIXTURE = Path(__file__).parent / "fixtures" / "matches.json"
+
+
+@pytest.fixture(scope="module")
+def matches() -> list[dict]:
+    return [json.loads(line) for line in FIXTURE.read_text().splitlines() if line]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 400])
+def test_transform_matches_batch(matches: list[dict], batch_size: int):
+    expected = [transform_matches(_match) for _match in matches]
+    actual = [
+        row
+        for i in range(0, len(matches), batch_size)
+        for row in transform_matches_batch(get_columns(matches[i : i + batch_size]))
+    ]
+    assert json.dumps(actual) == json.dumps(expected)
+
+
+def test_fixture_covers_edge_cases(matches: list[dict]):
+    goals = [goal for _match in matches for goal in _match["homeGoals"]]
+    assert any("+" in goal for goal in goals)
+    assert any(goal == "None" for goal in goals)
+    assert any(_match["total_xg"] <= 0 for _match in matches)
+    assert any(not _match["goal_timings_recorded"] for _match in matches)
+    assert any(
+        _match["card_timings_recorded"]
+        and _match["team_a_red_cards"] != _match["team_b_red_cards"]
+        for _match in matches
+    )